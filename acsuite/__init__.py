@@ -1,21 +1,63 @@
 """Frame-based cutting/trimming/splicing of audio with VapourSynth and FFmpeg."""
-__all__ = ["clip_to_timecodes", "concat", "eztrim", "f2ts"]
+__all__ = [
+    "CancelToken",
+    "clip_to_timecodes",
+    "concat",
+    "eztrim",
+    "eztrim_array",
+    "Executor",
+    "f2ts",
+    "frame_time",
+    "FiltergraphExecutor",
+    "PCMExecutor",
+    "plan_trim",
+    "Progress",
+    "SerialExecutor",
+    "ThreadedExecutor",
+    "TrimPlan",
+    "TrimSegment",
+]
 try:
     from ._metadata import __author__, __credits__, __date__, __version__  # type: ignore
 except ImportError:
     __author__ = __credits__ = __date__ = __version__ = "unknown (portable mode)"  # type: ignore
 
+import abc
 import collections
+import dataclasses
 import fractions
 import functools
+import json
+import math
 import os
+import struct
+import threading
+import weakref
+from concurrent import futures
 from shutil import which
-from subprocess import run
-from typing import cast, Deque, Dict, List, Optional, Tuple, TYPE_CHECKING, Union
+from subprocess import DEVNULL, PIPE, Popen, run
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    cast,
+    Deque,
+    Dict,
+    IO,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    TYPE_CHECKING,
+    Union,
+)
 from warnings import simplefilter, warn
 
 import vapoursynth as vs
 
+if TYPE_CHECKING:
+    import numpy as np
+
 simplefilter("always")  # display warnings
 
 Trim = Tuple[Optional[int], Optional[int]]
@@ -41,6 +83,147 @@ VALID_FFMPEG_EXTENSIONS = [
 ]
 # fmt: on
 
+# reads the file list from stdin, see _concat_list()
+_CONCAT_DEMUXER_ARGS = ["-f", "concat", "-safe", "0", "-protocol_whitelist", "file,pipe", "-i", "pipe:0"]
+_WAV_DTYPES = {(1, 8): "u1", (1, 16): "<i2", (1, 32): "<i4", (3, 32): "<f4", (3, 64): "<f8"}
+# FFmpeg demuxers for raw elementary streams, whose duration is only ever estimated from the bitrate
+_RAW_AUDIO_FORMATS = {"aac", "ac3", "dts", "dtshd", "eac3", "mlp", "mp3", "truehd"}
+
+
+@dataclasses.dataclass
+class TrimSegment:
+    """
+    One contiguous range of the source audio that will be cut out by FFmpeg.
+
+    :param start:      First frame of the range (already converted to a positive index).
+    :param end:        Frame after the last frame of the range (not inclusive).
+    :param start_time: Exact time in seconds where the range starts.
+    :param end_time:   Exact time in seconds where the range ends.
+    :param start_ts:   `start_time` rounded to a timestamp, as passed to FFmpeg's ``-ss``.
+    :param end_ts:     `end_time` rounded to a timestamp, as passed to FFmpeg's ``-to``.
+    :param outfile:    File this range is written to (a temporary file if the plan has more than one segment).
+    :param chunk:      Index of this segment within its trim when long trims are split into chunks
+                       (see `chunk_seconds` in :func:`plan_trim`). `start` and `end` are always those of the whole trim.
+    """
+
+    start: int
+    end: int
+    start_time: fractions.Fraction
+    end_time: fractions.Fraction
+    start_ts: str
+    end_ts: str
+    outfile: str
+    chunk: int = 0
+
+
+@dataclasses.dataclass
+class TrimPlan:
+    """
+    Fully resolved description of a trimming job, produced by :func:`plan_trim`.
+
+    A plan holds no references to VapourSynth objects, so it can be computed up front, serialized with
+    :meth:`to_json`, cached, and carried out later (or elsewhere) by any :class:`Executor`.
+
+    :param audio_file:  Source audio file.
+    :param outfile:     Final output file.
+    :param ffmpeg_path: FFmpeg executable used by the FFmpeg-based executors.
+    :param codec_args:  FFmpeg codec arguments used for each segment.
+    :param segments:    Ranges to cut, in output order. Empty if the trims would cause no trimming.
+    :param quiet:       Suppresses most console output from FFmpeg.
+    :param transcode:   Whether the audio is decoded and re-encoded rather than stream-copied.
+                        Transcoded segments seek on the input, so each one only decodes its own range.
+    :param concat_codec_args: FFmpeg codec arguments used when joining the segment files.
+    :param rounding:    Rounding mode used to turn exact times into timestamps or sample positions
+                        (see :func:`f2ts`).
+    :param audio_duration: Length in seconds of `audio_file` as probed when planning, ``None`` if unknown.
+    """
+
+    audio_file: str
+    outfile: str
+    ffmpeg_path: str
+    codec_args: List[str]
+    segments: List[TrimSegment]
+    quiet: bool = False
+    transcode: bool = False
+    concat_codec_args: List[str] = dataclasses.field(default_factory=lambda: ["-c", "copy"])
+    rounding: str = "round"
+    audio_duration: Optional[fractions.Fraction] = None
+
+    @property
+    def frames(self) -> List[Tuple[int, int]]:
+        """Resolved ``(start, end)`` frame ranges of every trim."""
+        return [(seg.start, seg.end) for seg in self.segments if seg.chunk == 0]
+
+    @property
+    def ffmpeg_silence(self) -> List[str]:
+        """Leading FFmpeg arguments shared by every invocation of this plan."""
+        if self.quiet:
+            return [self.ffmpeg_path, "-hide_banner", "-loglevel", "16"]
+        return [self.ffmpeg_path, "-hide_banner"]
+
+    def segment_args(self, segment: TrimSegment) -> List[str]:
+        """FFmpeg arguments that cut `segment` out of the source audio."""
+        if self.transcode:
+            cut = ["-ss", segment.start_ts, "-to", segment.end_ts, "-i", self.audio_file, "-vn"]
+        else:
+            cut = ["-i", self.audio_file, "-vn", "-ss", segment.start_ts, "-to", segment.end_ts]
+        return self.ffmpeg_silence + cut + self.codec_args + [segment.outfile]
+
+    def concat_args(self) -> List[str]:
+        """
+        FFmpeg arguments that join the segment files into the final output.
+
+        The list of files is read from stdin, see :meth:`concat_list`.
+        """
+        return self.ffmpeg_silence + _CONCAT_DEMUXER_ARGS + self.concat_codec_args + [self.outfile]
+
+    def segment_duration(self, segment: TrimSegment) -> fractions.Fraction:
+        """Predicted length in seconds of `segment`, cut short if the audio ends before the segment does."""
+        end = segment.end_time if self.audio_duration is None else min(segment.end_time, self.audio_duration)
+        return max(end - segment.start_time, fractions.Fraction())
+
+    @property
+    def duration(self) -> fractions.Fraction:
+        """Predicted length in seconds of the output."""
+        return sum((self.segment_duration(seg) for seg in self.segments), fractions.Fraction())
+
+    def concat_list(self) -> str:
+        """The list of segment files for FFmpeg's concat demuxer, to be passed to :meth:`concat_args` on stdin."""
+        return _concat_list([seg.outfile for seg in self.segments])
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain ``dict`` representation of the plan (only built-in types, exact times become ``'num/den'``)."""
+        data = dataclasses.asdict(self)
+        for seg in data["segments"]:
+            seg["start_time"], seg["end_time"] = str(seg["start_time"]), str(seg["end_time"])
+        if data["audio_duration"] is not None:
+            data["audio_duration"] = str(data["audio_duration"])
+        return data
+
+    def to_json(self, **kwargs: Any) -> str:
+        """Serializes the plan to JSON. Keyword arguments are passed to :func:`json.dumps`."""
+        return json.dumps(self.to_dict(), **kwargs)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TrimPlan":
+        """Rebuilds a plan from the output of :meth:`to_dict`."""
+        data = dict(data)
+        segments = []
+        for seg in data["segments"]:
+            seg = dict(seg)
+            for key in ("start_time", "end_time"):
+                seg[key] = fractions.Fraction(seg[key])
+            segments.append(TrimSegment(**seg))
+        data["segments"] = segments
+        if data.get("audio_duration") is not None:
+            data["audio_duration"] = fractions.Fraction(data["audio_duration"])
+        return cls(**data)
+
+    @classmethod
+    def from_json(cls, s: str) -> "TrimPlan":
+        """Rebuilds a plan from the output of :meth:`to_json`."""
+        return cls.from_dict(json.loads(s))
+
 
 def eztrim(
     clip: vs.VideoNode,
@@ -52,6 +235,12 @@ def eztrim(
     ffmpeg_path: Optional[str] = None,
     quiet: bool = False,
     timecodes_file: Optional[str] = None,
+    lossless_ext: str = ".wav",
+    chunk_seconds: Optional[float] = 300,
+    rounding: str = "round",
+    executor: Optional["Executor"] = None,
+    progress: Optional[Callable[["Progress"], None]] = None,
+    cancel: Optional["CancelToken"] = None,
     debug: bool = False,
 ) -> Union[Dict, str]:
     """
@@ -72,6 +261,7 @@ def eztrim(
     >>> 'A single slice can be entered as a single tuple:'
     >>> eztrim(src, (3, -13), 'audio_file.wav')
 
+    This is a shortcut for ``executor.execute(plan_trim(...))``.
 
     :param clip:          Input clip needed to determine framerate for audio timecodes
                           and ``clip.num_frames`` for negative indexing.
@@ -86,7 +276,7 @@ def eztrim(
     :param audio_file:    A string to the source audio file's location
                           (i.e. '/path/to/audio_file.ext').
                           If the extension is not recognized as a valid audio file extension for FFmpeg's encoders,
-                          the audio will be re-encoded to WAV losslessly.
+                          the audio will be transcoded losslessly to `lossless_ext`, keeping its bit depth.
 
     :param outfile:       Either a filename 'out.ext' or a full path '/path/to/out.ext'
                           that will be used for the trimmed audio file.
@@ -102,22 +292,129 @@ def eztrim(
     :param timecodes_file: Timecodes v2 file (generated by vspipe, ffms2, etc.) for variable-frame-rate clips.
                            Not needed for CFR clips.
 
+    :param lossless_ext:  Output format used when the audio has to be transcoded, see :func:`plan_trim`.
+
+    :param chunk_seconds: Chunk length used when transcoding, see :func:`plan_trim`.
+
+    :param rounding:      How exact frame times are rounded to timestamps, see :func:`plan_trim`.
+
+    :param executor:      An :class:`Executor` used to carry out the plan. Defaults to a :class:`SerialExecutor`,
+                          or a :class:`ThreadedExecutor` with one worker per CPU when the audio has to be transcoded.
+
+    :param progress:      Called with a :class:`Progress` every time FFmpeg reports progress
+                          (about twice a second per running FFmpeg process).
+
+    :param cancel:        A :class:`CancelToken`. Cancelling it from another thread stops FFmpeg,
+                          removes any partial output and raises :class:`concurrent.futures.CancelledError`.
+
+    :param debug:         Returns the plan (as from :meth:`TrimPlan.to_dict`) instead of executing it.
+
     :return: Returns output file name as a string for other functions.
     """
+    plan = plan_trim(
+        clip,
+        trims,
+        audio_file,
+        outfile,
+        ffmpeg_path=ffmpeg_path,
+        quiet=quiet,
+        timecodes_file=timecodes_file,
+        lossless_ext=lossless_ext,
+        chunk_seconds=chunk_seconds,
+        rounding=rounding,
+    )
+    if debug:
+        return plan.to_dict()
+    if executor is None:
+        executor = ThreadedExecutor(os.cpu_count()) if plan.transcode else SerialExecutor()
+    return executor.execute(plan, progress=progress, cancel=cancel)
+
+
+def plan_trim(
+    clip: vs.VideoNode,
+    /,
+    trims: Union[List[Trim], Trim],
+    audio_file: str,
+    outfile: Optional[str] = None,
+    *,
+    ffmpeg_path: Optional[str] = None,
+    quiet: bool = False,
+    timecodes_file: Optional[str] = None,
+    lossless_ext: str = ".wav",
+    chunk_seconds: Optional[float] = 300,
+    rounding: str = "round",
+) -> TrimPlan:
+    """
+    Validates the input of :func:`eztrim` and resolves it into a :class:`TrimPlan` without running anything.
+
+    >>> plan = plan_trim(src, [(3, 22), (23, 40)], 'audio_file.wav')
+    >>> plan.frames
+    [(3, 22), (23, 40)]
+    >>> ThreadedExecutor().execute(TrimPlan.from_json(plan.to_json()))
+    'audio_file_cut.wav'
+
+    The audio is probed once (cached while the file is unchanged) and trims reaching past its end raise
+    a ``ValueError`` before anything is cut (only a warning for raw streams like ADTS AAC, AC-3 or DTS,
+    whose length FFmpeg can only estimate). :attr:`TrimPlan.duration` is the predicted length of the output.
+
+    :param clip:          Input clip needed to determine framerate for audio timecodes
+                          and ``clip.num_frames`` for negative indexing.
+    :param trims:         Either a list of 2-tuples, or one tuple of 2 ints.
+
+        Empty slicing must represented with a ``None``.
+            ``src[:10]+src[-5:]`` must be entered as ``trims=[(None, 10), (-5, None)]``.
+
+        Single frame slices must be represented as a normal slice.
+            ``src[15]`` must be entered as ``trims=(15, 16)``.
+
+    :param audio_file:    A string to the source audio file's location
+                          (i.e. '/path/to/audio_file.ext').
+                          If the extension is not recognized as a valid audio file extension for FFmpeg's encoders,
+                          the audio will be transcoded losslessly to `lossless_ext`, keeping its bit depth.
+
+    :param outfile:       Either a filename 'out.ext' or a full path '/path/to/out.ext'
+                          that will be used for the trimmed audio file.
+                          The extension will be automatically inserted for you,
+                          and if it is given, it will be overwritten by the input `audio_file`'s extension.
+                          If left blank, defaults to ``audio_file_cut.ext``.
+
+    :param ffmpeg_path: Set this if ``ffmpeg`` is not in your `PATH`.
+                        If ``ffmpeg`` exists in your `PATH`, it will automatically be detected and used.
+
+    :param quiet:         Suppresses most console output from FFmpeg.
+
+    :param timecodes_file: Timecodes v2 file (generated by vspipe, ffms2, etc.) for variable-frame-rate clips.
+                           Not needed for CFR clips.
+
+    :param lossless_ext:  Output format used when the audio has to be transcoded: ``'.wav'``, ``'.w64'`` or ``'.flac'``.
+                          Requires ``ffprobe`` to find the source's sample format.
+
+    :param chunk_seconds: When transcoding, trims longer than this are split into chunks of this many seconds
+                          so they can be encoded in parallel. ``None`` disables chunking.
+
+    :param rounding:      How exact frame times are rounded to FFmpeg's millisecond timestamps (see :func:`f2ts`).
+                          Times are kept exact in the plan until this single rounding step.
+
+    :return: A :class:`TrimPlan`. Its `segments` are empty if the trims would cause no trimming.
+    """
     # --- checking for filename issues and file extension support ------------------------------------------------------
     if not os.path.isfile(audio_file):
-        raise FileNotFoundError(f"eztrim: {audio_file} not found")
+        raise FileNotFoundError(f"plan_trim: {audio_file} not found")
     audio_file_name, audio_file_ext = os.path.splitext(audio_file)
 
     codec_args = []
-    if audio_file_ext in VALID_FFMPEG_EXTENSIONS:
+    transcode = audio_file_ext not in VALID_FFMPEG_EXTENSIONS
+    if not transcode:
         codec_args += ["-c:a", "copy", "-rf64", "auto"]
     else:
+        if lossless_ext not in (".wav", ".w64", ".flac"):
+            raise ValueError(f"plan_trim: lossless_ext must be '.wav', '.w64' or '.flac', not {lossless_ext!r}")
         warn(
-            f"eztrim: {audio_file_ext} is not a supported extension by FFmpeg's audio encoders, re-encoding to WAV",
+            f"plan_trim: {audio_file_ext} is not a supported extension by FFmpeg's audio encoders, "
+            f"transcoding losslessly to {lossless_ext}",
             Warning,
         )
-        audio_file_ext = ".wav"  # defaults to pcm_s16le so a 24-bit input with wrong ext will be downscaled
+        audio_file_ext = lossless_ext
 
     # --- re-naming outfile if not formatted correctly -----------------------------------------------------------------
     if outfile is None:
@@ -125,131 +422,507 @@ def eztrim(
     elif not os.path.splitext(outfile)[1]:
         outfile += audio_file_ext
     elif os.path.splitext(outfile)[1] != audio_file_ext:
-        warn(f"eztrim: the outfile does not have the correct extension, changing to {audio_file_ext}", Warning)
+        warn(f"plan_trim: the outfile does not have the correct extension, changing to {audio_file_ext}", Warning)
         outfile = os.path.splitext(outfile)[0] + audio_file_ext
 
     if os.path.isfile(outfile):
-        raise FileExistsError(f"eztrim: {outfile} already exists")
+        raise FileExistsError(f"plan_trim: {outfile} already exists")
 
     # --- checking for ffmpeg ------------------------------------------------------------------------------------------
-    if ffmpeg_path is None:
-        if not which("ffmpeg"):
-            raise FileNotFoundError("eztrim: ffmpeg executable not found in PATH")
-        else:
-            ffmpeg_path = which("ffmpeg")
-    else:
-        if not os.path.isfile(ffmpeg_path):
-            raise FileNotFoundError(f"eztrim: ffmpeg executable at {ffmpeg_path} not found")
-
-    if TYPE_CHECKING:
-        assert isinstance(ffmpeg_path, str)
+    ffmpeg_path = _find_ffmpeg(ffmpeg_path, "plan_trim")
 
     # --- timecodes ----------------------------------------------------------------------------------------------------
 
     if (timecodes_file is not None) and (not os.path.isfile(timecodes_file)):
-        raise FileNotFoundError(f"eztrim: {timecodes_file} not found")
+        raise FileNotFoundError(f"plan_trim: {timecodes_file} not found")
 
-    # --- trims --------------------------------------------------------------------------------------------------------
-    if not isinstance(trims, (list, tuple)):
-        raise TypeError("eztrim: trims must be a list of 2-tuples (or just one 2-tuple)")
+    if rounding not in _ROUNDING:
+        raise ValueError(f"plan_trim: rounding must be one of {', '.join(_ROUNDING)}")
 
-    if len(trims) == 1 and isinstance(trims, list):
-        warn(
-            "eztrim: using a list of one 2-tuple is not recommended; for a single trim,"
-            "directly use a tuple: `trims=(5,-2)` instead of `trims=[(5,-2)]`",
-            SyntaxWarning,
-        )
-        if isinstance(trims[0], tuple):
-            trims = trims[0]  # convert nested tuple in a list to just the tuple
-        else:
-            raise TypeError("eztrim: the inner trim must be a tuple")
-    if isinstance(trims, tuple):
-        if len(trims) != 2:
-            raise ValueError("eztrim: a single tuple trim must have 2 elements")
-        if not all(isinstance(i, (int, type(None))) for i in trims):
-            raise TypeError("eztrim: the trim must contain only 2 ints or Nones")
-        if trims[-1] == 0:
-            raise ValueError("eztrim: slices cannot end with 0, if attempting to use an empty slice, use `None`")
-        if trims == (None, None):
-            warn("eztrim: None, None slice will cause no trimming, quitting early", Warning)
-            if debug:
-                return locals()
-            else:
-                return outfile
-    elif isinstance(trims, list):
-        for trim in trims:
-            if not isinstance(trim, tuple):
-                raise TypeError(f"eztrim: the trim {trim} is not a tuple")
-            if len(trim) != 2:
-                raise ValueError(f"eztrim: the trim {trim} needs 2 elements")
-            for i in trim:
-                if not isinstance(i, (int, type(None))):
-                    raise TypeError(f"eztrim: the trim {trim} must have 2 ints or None's")
-            if trim[-1] == 0:
-                raise ValueError("eztrim: slices cannot end with 0, if attempting to use an empty slice, use `None`")
+    # --- trims --------------------------------------------------------------------------------------------------------
+    frames = _resolve_trims(clip.num_frames, trims, "plan_trim")
+    if not frames:
+        warn("plan_trim: None, None slice will cause no trimming, quitting early", Warning)
+        return TrimPlan(audio_file, outfile, ffmpeg_path, codec_args, [], quiet, transcode, rounding=rounding)
 
-    # ------------------------------------------------------------------------------------------------------------------
+    ft = functools.partial(frame_time, timecodes_file=timecodes_file, src_clip=clip)
+    ranges = [(s, e, ft(s), ft(e), 0) for s, e in frames]
 
-    num_frames = clip.num_frames
-    ts = functools.partial(f2ts, timecodes_file=timecodes_file, src_clip=clip)
-    ffmpeg_silence = [ffmpeg_path, "-hide_banner", "-loglevel", "16"] if quiet else [ffmpeg_path, "-hide_banner"]
+    # --- checking the trims against the length of the audio -----------------------------------------------------------
+    try:
+        info: Optional[_AudioInfo] = _probe_audio(audio_file, ffmpeg_path)
+    except (ValueError, FileNotFoundError):
+        if transcode:
+            raise
+        warn(f"plan_trim: could not probe {audio_file}, the trims are not checked against its length", Warning)
+        info = None
+    audio_duration = info.duration if info is not None else None
+    if info is not None and info.duration is not None:
+        _check_audio_length(frames, ft, info.duration, info.exact_duration, audio_file, "plan_trim")
+
+    # --- lossless transcoding -----------------------------------------------------------------------------------------
+    concat_codec_args = ["-c", "copy"]
+    temp_ext = audio_file_ext
+    if transcode:
+        if TYPE_CHECKING:
+            assert info is not None
+        if chunk_seconds is not None:
+            ranges = [chunk for r in ranges for chunk in _chunk_range(*r[:4], fractions.Fraction(chunk_seconds))]
+        codec_args = _lossless_codec_args(info, audio_file_ext)
+        if len(ranges) > 1 and audio_file_ext == ".flac":
+            # FLAC frames are numbered, so joined FLAC files would be broken: cut to PCM and encode once when joining
+            concat_codec_args, codec_args, temp_ext = codec_args, _lossless_codec_args(info, ".w64"), ".w64"
+    if audio_file_ext == ".wav":
+        concat_codec_args += ["-rf64", "auto"]  # joined WAVs pass 4 GiB easily, i.e. multi-hour 24-bit 5.1
+
+    ts = functools.partial(_format_ts, rounding=rounding)
 
     # --- single trim --------------------------------------------------------------------------------------------------
-    if isinstance(trims, tuple):
-        start, end = _negative_to_positive(num_frames, *trims)
-        if TYPE_CHECKING:
-            assert isinstance(start, int)
-            assert isinstance(end, int)
-        if end <= start:
-            raise ValueError("eztrim: the trim is not logical")
-        args = ffmpeg_silence + ["-i", audio_file, "-vn", "-ss", ts(start), "-to", ts(end)] + codec_args + [outfile]
-        if debug:
-            return locals()
-        else:
-            run(args)
-            return outfile
+    if len(ranges) == 1:
+        s, e, start_time, end_time, _ = ranges[0]
+        segments = [TrimSegment(s, e, start_time, end_time, ts(start_time), ts(end_time), outfile)]
+        return TrimPlan(
+            audio_file,
+            outfile,
+            ffmpeg_path,
+            codec_args,
+            segments,
+            quiet,
+            transcode,
+            rounding=rounding,
+            audio_duration=audio_duration,
+        )
 
     # --- multiple trims with concatenation ----------------------------------------------------------------------------
-    starts, ends = _negative_to_positive(num_frames, [s for s, e in trims], [e for s, e in trims])
-    if TYPE_CHECKING:
-        assert isinstance(starts, list)
-        assert isinstance(ends, list)
-    if not _check_ordered(starts, ends):
-        raise ValueError("eztrim: the trims are not logical")
+    segments = [
+        TrimSegment(s, e, a, b, ts(a), ts(b), f"_acsuite_temp_output_{key}" + temp_ext, chunk)
+        for key, (s, e, a, b, chunk) in enumerate(ranges)
+    ]
+    return TrimPlan(
+        audio_file,
+        outfile,
+        ffmpeg_path,
+        codec_args,
+        segments,
+        quiet,
+        transcode,
+        concat_codec_args,
+        rounding,
+        audio_duration,
+    )
+
+
+class Progress(NamedTuple):
+    """
+    Snapshot of a running job, passed to the `progress` callback of :func:`eztrim`, :func:`concat` and executors.
+
+    :param segment:        Index of the segment being cut,
+                           or ``None`` for a step that writes the whole output (i.e. joining the segments).
+    :param out_time:       Seconds of audio written so far by the current step.
+    :param duration:       Length in seconds of the current step's output, if known.
+    :param total_time:     Seconds of audio cut so far across all segments (equal to `out_time` for ``None`` steps).
+    :param total_duration: Combined length in seconds of all segments, if known.
+    :param speed:          FFmpeg's processing speed as a multiple of realtime, if reported.
+    :param total_size:     Bytes written so far by the current step.
+    :param done:           Whether the current step has finished.
+    """
 
-    if os.path.isfile("_acsuite_temp_concat.txt"):
-        raise FileExistsError("eztrim: _acsuite_temp_concat.txt already exists, quitting")
-    else:
-        temp_filelist = []
-        if not debug:
-            concat_file = open("_acsuite_temp_concat.txt", "w")
-
-    times = zip([ts(f) for f in starts], [ts(f) for f in ends])
-    for key, time in enumerate(times):
-        outfile_tmp = f"_acsuite_temp_output_{key}" + os.path.splitext(outfile)[-1]
-        if not debug:
-            concat_file.write(f"file {outfile_tmp}\n")
-        temp_filelist.append(outfile_tmp)
-        args = ffmpeg_silence + ["-i", audio_file, "-vn", "-ss", time[0], "-to", time[1]] + codec_args + [outfile_tmp]
-        if not debug:
-            run(args)
-
-    if not debug:
-        concat_file.close()
-    args = ffmpeg_silence + ["-f", "concat", "-i", "_acsuite_temp_concat.txt", "-c", "copy", outfile]
-    if debug:
-        return locals()
-    else:
-        run(args)
+    segment: Optional[int]
+    out_time: float
+    duration: Optional[float]
+    total_time: float
+    total_duration: Optional[float]
+    speed: Optional[float]
+    total_size: int
+    done: bool
+
+
+class CancelToken:
+    """
+    Thread-safe flag used to stop a running job from another thread.
+
+    Once :meth:`cancel` is called, running FFmpeg processes are terminated, partially written files are removed,
+    and the job raises :class:`concurrent.futures.CancelledError`.
+    """
+
+    def __init__(self) -> None:
+        self._event = threading.Event()
+        self._children: "weakref.WeakSet[CancelToken]" = weakref.WeakSet()
+
+    def cancel(self) -> None:
+        """Requests cancellation of every job using this token."""
+        self._event.set()
+        for child in list(self._children):
+            child.cancel()
+
+    def _child(self) -> "CancelToken":
+        """A new token that is also cancelled with this one, so a job can stop its own workers on errors."""
+        child = CancelToken()
+        self._children.add(child)
+        if self.cancelled:
+            child.cancel()
+        return child
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether :meth:`cancel` has been called."""
+        return self._event.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Blocks until the token is cancelled or `timeout` seconds pass. Returns :attr:`cancelled`."""
+        return self._event.wait(timeout)
+
+
+class Executor(abc.ABC):
+    """
+    Base class for the backends that carry out a :class:`TrimPlan`.
+
+    Subclasses implement :meth:`execute`, which must create ``plan.outfile`` and return its name.
+    A plan with no segments is a no-op.
+    """
+
+    @abc.abstractmethod
+    def execute(
+        self,
+        plan: TrimPlan,
+        *,
+        progress: Optional[Callable[[Progress], None]] = None,
+        cancel: Optional[CancelToken] = None,
+    ) -> str:
+        """
+        Carries out `plan`.
+
+        :param progress: Called with a :class:`Progress` every time FFmpeg reports progress.
+        :param cancel:   A :class:`CancelToken` that can be used to stop the job.
+
+        :return: The output file name.
+        """
+
+    @staticmethod
+    def _tracker(plan: TrimPlan, progress: Optional[Callable[[Progress], None]]) -> "_ProgressTracker":
+        durations = [float(plan.segment_duration(seg)) for seg in plan.segments]
+        return _ProgressTracker(progress, durations)
+
+    @staticmethod
+    def _run(args: List[str], created: List[str], **kwargs: Any) -> None:
+        """:func:`_run_ffmpeg`, adding its output file to `created` unless the file was already there."""
+        if not os.path.exists(args[-1]):
+            created.append(args[-1])
+        _run_ffmpeg(args, **kwargs)
+
+    @classmethod
+    def _join(
+        cls, plan: TrimPlan, created: List[str], tracker: "_ProgressTracker", cancel: Optional[CancelToken]
+    ) -> None:
+        """Concatenates the segment files of a multi-segment plan with FFmpeg, then removes them."""
+        cls._run(plan.concat_args(), created, stdin=plan.concat_list(), on_progress=tracker.step(None), cancel=cancel)
+
+        for seg in plan.segments:
+            os.remove(seg.outfile)
+
+    @staticmethod
+    def _cleanup(created: List[str]) -> None:
+        """Removes the files a cancelled job created (and nothing else, they may belong to another job)."""
+        for file in created:
+            if os.path.isfile(file):
+                os.remove(file)
+
+
+class SerialExecutor(Executor):
+    """Runs one FFmpeg process per segment, one after the other (the classic :func:`eztrim` behavior)."""
+
+    def execute(
+        self,
+        plan: TrimPlan,
+        *,
+        progress: Optional[Callable[[Progress], None]] = None,
+        cancel: Optional[CancelToken] = None,
+    ) -> str:
+        tracker = self._tracker(plan, progress)
+        created: List[str] = []
+        try:
+            for key, seg in enumerate(plan.segments):
+                self._run(plan.segment_args(seg), created, on_progress=tracker.step(key), cancel=cancel)
+            if len(plan.segments) > 1:
+                self._join(plan, created, tracker, cancel)
+        except BaseException:  # cancelled, FFmpeg or the progress callback failed, ...
+            self._cleanup(created)
+            raise
+        return plan.outfile
+
+
+class ThreadedExecutor(Executor):
+    """
+    Runs the per-segment FFmpeg processes concurrently, then joins them.
+
+    :param max_workers: Maximum number of FFmpeg processes running at once.
+                        Defaults to :class:`concurrent.futures.ThreadPoolExecutor`'s default.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None) -> None:
+        self.max_workers = max_workers
+
+    def execute(
+        self,
+        plan: TrimPlan,
+        *,
+        progress: Optional[Callable[[Progress], None]] = None,
+        cancel: Optional[CancelToken] = None,
+    ) -> str:
+        tracker = self._tracker(plan, progress)
+        created: List[str] = []
+        stop = cancel._child() if cancel is not None else CancelToken()
+        try:
+            with futures.ThreadPoolExecutor(self.max_workers) as pool:
+                jobs = [
+                    pool.submit(self._run, plan.segment_args(seg), created, on_progress=tracker.step(key), cancel=stop)
+                    for key, seg in enumerate(plan.segments)
+                ]
+                try:
+                    for job in jobs:
+                        job.result()
+                except BaseException:
+                    stop.cancel()  # one worker failed, stop the others before the pool waits for them
+                    raise
+            if len(plan.segments) > 1:
+                self._join(plan, created, tracker, stop)
+        except BaseException:
+            self._cleanup(created)
+            raise
+        return plan.outfile
+
+
+class FiltergraphExecutor(Executor):
+    """
+    Cuts and joins every segment in a single FFmpeg process using the ``atrim`` and ``concat`` filters.
+
+    No temporary files are written, but filtering means the audio is decoded and re-encoded,
+    so the plan's stream-copy `codec_args` cannot be used.
+
+    :param codec_args: FFmpeg codec arguments for the output (i.e. ``['-c:a', 'pcm_s24le']``).
+                       Defaults to the plan's lossless codec arguments for transcode plans (keeping the bit depth),
+                       and to FFmpeg's default encoder for the output's extension otherwise.
+    """
+
+    def __init__(self, codec_args: Optional[List[str]] = None) -> None:
+        self.codec_args = codec_args
+
+    def output_args(self, plan: TrimPlan) -> List[str]:
+        """The FFmpeg codec arguments used to encode the output of `plan`."""
+        if self.codec_args is not None:
+            return self.codec_args
+        if not plan.transcode:
+            return []
+        # multi-segment FLAC plans cut to PCM and encode in the join step, everything else encodes when cutting
+        return plan.concat_codec_args if plan.concat_codec_args[:2] != ["-c", "copy"] else plan.codec_args
+
+    def graph(self, plan: TrimPlan, sample_rate: Optional[int] = None) -> str:
+        """
+        The ``-filter_complex`` graph for `plan`.
+
+        Segments are trimmed at sample positions, rounded once with the plan's `rounding` mode.
+        `sample_rate` is probed from ``plan.audio_file`` if not given.
+        """
+        if sample_rate is None:
+            sample_rate = _probe_audio(plan.audio_file, plan.ffmpeg_path).sample_rate
+        to_sample = _ROUNDING[plan.rounding]
+        chains = [
+            f"[0:a]atrim=start_sample={to_sample(seg.start_time * sample_rate)}"
+            f":end_sample={to_sample(seg.end_time * sample_rate)},asetpts=PTS-STARTPTS[a{key}]"
+            for key, seg in enumerate(plan.segments)
+        ]
+        labels = "".join(f"[a{key}]" for key in range(len(plan.segments)))
+        return ";".join(chains + [f"{labels}concat=n={len(plan.segments)}:v=0:a=1[out]"])
+
+    def execute(
+        self,
+        plan: TrimPlan,
+        *,
+        progress: Optional[Callable[[Progress], None]] = None,
+        cancel: Optional[CancelToken] = None,
+    ) -> str:
+        if plan.segments:
+            tracker = self._tracker(plan, progress)
+            args = plan.ffmpeg_silence + ["-i", plan.audio_file, "-filter_complex", self.graph(plan), "-map", "[out]"]
+            created: List[str] = []
+            try:
+                self._run(
+                    args + self.output_args(plan) + [plan.outfile],
+                    created,
+                    on_progress=tracker.step(None),
+                    cancel=cancel,
+                )
+            except BaseException:
+                self._cleanup(created)
+                raise
+        return plan.outfile
+
+
+class PCMExecutor(Executor):
+    """
+    Splices the segments of a WAV (or RF64) source natively in Python, without FFmpeg.
+
+    Segment boundaries are converted to sample positions and the raw PCM data is copied straight into the output,
+    so this is both lossless and bit-exact. Only uncompressed WAV input and ``.wav`` output are supported.
+    Progress is reported once per segment, and cancellation is checked between segments.
+    """
+
+    def execute(
+        self,
+        plan: TrimPlan,
+        *,
+        progress: Optional[Callable[[Progress], None]] = None,
+        cancel: Optional[CancelToken] = None,
+    ) -> str:
+        if os.path.splitext(plan.outfile)[1].lower() != ".wav":
+            raise ValueError(f"PCMExecutor: can only write WAV files, not {plan.outfile}")
+        if not plan.segments:
+            return plan.outfile
+        try:
+            wav = _read_wav_header(plan.audio_file)
+        except ValueError:
+            raise ValueError(f"PCMExecutor: {plan.audio_file} is not an uncompressed PCM WAV file") from None
+        num_samples = wav.data_size // wav.block_align
+        to_sample = _ROUNDING[plan.rounding]
+        pieces = []
+        for seg in plan.segments:
+            first = min(to_sample(seg.start_time * wav.sample_rate), num_samples)
+            last = min(to_sample(seg.end_time * wav.sample_rate), num_samples)
+            pieces.append(
+                (plan.audio_file, wav.data_offset + first * wav.block_align, (last - first) * wav.block_align)
+            )
+
+        tracker = self._tracker(plan, progress)
+        try:
+            _write_wav(plan.outfile, wav.fmt, pieces, on_piece=tracker.piece_hook(pieces, cancel))
+        except futures.CancelledError:
+            self._cleanup([plan.outfile])  # _write_wav only ever writes to a new file
+            raise
+        return plan.outfile
+
+
+def eztrim_array(
+    clip: vs.VideoNode,
+    /,
+    trims: Union[List[Trim], Trim],
+    audio_file: str,
+    *,
+    ffmpeg_path: Optional[str] = None,
+    quiet: bool = False,
+    timecodes_file: Optional[str] = None,
+    rounding: str = "round",
+) -> Tuple["np.ndarray", int]:
+    """
+    Variant of :func:`eztrim` that returns the trimmed audio as a NumPy array instead of writing a file.
+
+    >>> samples, sample_rate = eztrim_array(src, [(3, 22), (23, 40)], 'audio_file.wav')
+    >>> samples.shape
+    (num_samples, channels)
+
+    Uncompressed WAV input is memory-mapped and only the requested ranges are read.
+    A single trim returns a read-only view into the file without copying anything,
+    multiple trims are copied into one new array.
+    24-bit WAV is widened to ``int32`` (keeping 24-bit values), other PCM keeps its sample type.
+
+    Any other input is decoded by FFmpeg to 32-bit float, one range at a time,
+    straight into a preallocated array. A ``RuntimeError`` is raised if FFmpeg fails,
+    and a warning is shown if it decodes noticeably fewer samples than requested.
+
+    Requires ``numpy``. The parameters are the same as for :func:`plan_trim`,
+    `rounding` being used to turn the exact frame times into sample positions.
+    A ``(None, None)`` trim returns the audio for the whole `clip`.
+
+    :return: ``(samples, sample_rate)``, `samples` having the shape ``(num_samples, channels)``.
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        raise ImportError("eztrim_array: numpy is required for array output") from None
 
-        os.remove("_acsuite_temp_concat.txt")
-        for file in temp_filelist:
-            os.remove(file)
+    if not os.path.isfile(audio_file):
+        raise FileNotFoundError(f"eztrim_array: {audio_file} not found")
+    if (timecodes_file is not None) and (not os.path.isfile(timecodes_file)):
+        raise FileNotFoundError(f"eztrim_array: {timecodes_file} not found")
+    if rounding not in _ROUNDING:
+        raise ValueError(f"eztrim_array: rounding must be one of {', '.join(_ROUNDING)}")
+    to_sample = _ROUNDING[rounding]
 
-        return outfile
+    frames = _resolve_trims(clip.num_frames, trims, "eztrim_array") or [(0, clip.num_frames)]
+    ft = functools.partial(frame_time, timecodes_file=timecodes_file, src_clip=clip)
+    times = [(ft(s), ft(e)) for s, e in frames]
 
+    # --- uncompressed WAV ---------------------------------------------------------------------------------------------
+    try:
+        wav: Optional[_WavHeader] = _read_wav_header(audio_file)
+    except ValueError:
+        wav = None
+    if wav is not None and wav.data_size and wav.block_align == wav.channels * wav.bits // 8:
+        num_samples = wav.data_size // wav.block_align
+        audio_duration = fractions.Fraction(num_samples, wav.sample_rate)
+        _check_audio_length(frames, ft, audio_duration, True, audio_file, "eztrim_array")
+        ranges = [
+            (min(to_sample(s * wav.sample_rate), num_samples), min(to_sample(e * wav.sample_rate), num_samples))
+            for s, e in times
+        ]
+        if wav.bits == 24:
+            raw = np.memmap(audio_file, "u1", "r", wav.data_offset, (num_samples, wav.channels, 3))
+            samples = np.empty((sum(e - s for s, e in ranges), wav.channels), "<i4")
+            pos = 0
+            for s, e in ranges:
+                chunk = raw[s:e].astype("<i4")
+                chunk = chunk[..., 0] | chunk[..., 1] << 8 | chunk[..., 2] << 16
+                samples[pos : pos + e - s] = (chunk ^ 0x800000) - 0x800000  # sign-extend to 32 bits
+                pos += e - s
+            return samples, wav.sample_rate
+        if (dtype := _WAV_DTYPES.get((wav.format_tag, wav.bits))) is not None:
+            data = np.memmap(audio_file, dtype, "r", wav.data_offset, (num_samples, wav.channels))
+            if len(ranges) == 1:
+                return data[ranges[0][0] : ranges[0][1]], wav.sample_rate
+            return np.concatenate([data[s:e] for s, e in ranges]), wav.sample_rate
+
+    # --- anything else is decoded by ffmpeg ---------------------------------------------------------------------------
+    ffmpeg_path = _find_ffmpeg(ffmpeg_path, "eztrim_array")
+    info = _probe_audio(audio_file, ffmpeg_path)
+    if info.duration is not None:
+        _check_audio_length(frames, ft, info.duration, info.exact_duration, audio_file, "eztrim_array")
+    ffmpeg_silence = [ffmpeg_path, "-hide_banner", "-loglevel", "16"] if quiet else [ffmpeg_path, "-hide_banner"]
 
-def f2ts(f: int, /, *, precision: int = 3, timecodes_file: Optional[str] = None, src_clip: vs.VideoNode) -> str:
+    counts = [to_sample(e * info.sample_rate) - to_sample(s * info.sample_rate) for s, e in times]
+    samples = np.empty((sum(counts), info.channels), "<f4")
+    pos = 0
+    for (s, e), count in zip(times, counts):
+        args = ffmpeg_silence + ["-ss", str(float(s)), "-to", str(float(e)), "-i", audio_file, "-vn"]
+        with Popen(args + ["-f", "f32le", "-c:a", "pcm_f32le", "pipe:1"], stdin=DEVNULL, stdout=PIPE) as proc:
+            if TYPE_CHECKING:
+                assert proc.stdout is not None
+            buf = memoryview(samples[pos : pos + count]).cast("B")  # type: ignore
+            read = 0
+            while read < len(buf) and (n := proc.stdout.readinto(buf[read:])):  # type: ignore
+                read += n
+            proc.stdout.close()  # ffmpeg may still be writing past the end of the range
+        # a full buffer means the pipe was closed on purpose, ffmpeg exiting with a broken pipe error is expected then
+        if read < len(buf) and proc.returncode:
+            raise RuntimeError(f"eztrim_array: ffmpeg failed to decode {audio_file} (exit code {proc.returncode})")
+        decoded = read // samples.itemsize // info.channels
+        if count - decoded > info.sample_rate // 100:  # more than 10 ms missing
+            warn(
+                f"eztrim_array: ffmpeg only decoded {decoded} of {count} samples "
+                f"from {float(s):.3f}s to {float(e):.3f}s of {audio_file}",
+                Warning,
+            )
+        pos += decoded
+    return samples[:pos], info.sample_rate
+
+
+def f2ts(
+    f: int,
+    /,
+    *,
+    precision: int = 3,
+    timecodes_file: Optional[str] = None,
+    src_clip: vs.VideoNode,
+    rounding: str = "round",
+) -> str:
     """
     Converts frame number to a timestamp based on framerate.
 
@@ -265,44 +938,48 @@ def f2ts(f: int, /, *, precision: int = 3, timecodes_file: Optional[str] = None,
     :param src_clip: A VapourSynth clip for determining the timestamp.
                      ``src_clip.fps`` is used for CFR clips, and the frame props
                      (``_DurationNum`` and ``_DurationDen``) are used for VFR clips if a `timecodes_file` is not given.
+    :param rounding: How the exact time is rounded to `precision`: ``'round'`` (half to even), ``'half_up'``,
+                     ``'floor'`` or ``'ceil'``. This is the only rounding done, see :func:`frame_time`.
 
     :return: A string representing the timestamp of the requested frame number.
     """
     if precision not in [0, 3, 6, 9]:
         raise ValueError(f"f2ts: the precision {precision} must be a multiple of 3 (including 0)")
+    if rounding not in _ROUNDING:
+        raise ValueError(f"f2ts: rounding must be one of {', '.join(_ROUNDING)}")
+
+    return _format_ts(frame_time(f, timecodes_file=timecodes_file, src_clip=src_clip), precision, rounding)
 
+
+def frame_time(f: int, /, *, timecodes_file: Optional[str] = None, src_clip: vs.VideoNode) -> fractions.Fraction:
+    """
+    Converts frame number to its exact time in seconds, as a :class:`fractions.Fraction`.
+
+    This is what :func:`f2ts` and :func:`eztrim` use internally, nothing is rounded.
+    CFR times are ``f / src_clip.fps``, VFR times are the (decimal) millisecond values of the `timecodes_file`
+    or the sum of the frame durations (see :func:`clip_to_timecodes`).
+
+    :param f: Frame number (indexed from ``0``). Can be negative, indexing from the last frame of the `src_clip`.
+    :param timecodes_file: An optional path to a v2 timecodes plaintext file for VFR clips (not used for CFR clips).
+    :param src_clip: A VapourSynth clip for determining the time.
+
+    :return: The time of the start of frame `f`.
+    """
     if f < 0:
         f += src_clip.num_frames
 
     if f == 0:
-        s = 0.0
+        return fractions.Fraction()
     elif src_clip.fps != fractions.Fraction(0, 1):
-        t = round(float(10 ** 9 * f * src_clip.fps ** -1))
-        s = t / 10 ** 9
+        return f / src_clip.fps
+    elif timecodes_file is not None:
+        return _read_timecodes(timecodes_file)[f]
     else:
-        if timecodes_file is not None:
-            timecodes = [float(x) / 1000 for x in open(timecodes_file, "r").read().splitlines()[1:]]
-            s = timecodes[f]
-        else:
-            s = clip_to_timecodes(src_clip)[f]
-
-    m = s // 60
-    s %= 60
-    h = m // 60
-    m %= 60
-
-    if precision == 0:
-        return f"{h:02.0f}:{m:02.0f}:{round(s):02}"
-    elif precision == 3:
-        return f"{h:02.0f}:{m:02.0f}:{s:06.3f}"
-    elif precision == 6:
-        return f"{h:02.0f}:{m:02.0f}:{s:09.6f}"
-    elif precision == 9:
-        return f"{h:02.0f}:{m:02.0f}:{s:012.9f}"
+        return clip_to_timecodes(src_clip)[f]
 
 
 @functools.lru_cache
-def clip_to_timecodes(src_clip: vs.VideoNode) -> Deque[float]:
+def clip_to_timecodes(src_clip: vs.VideoNode) -> Deque[fractions.Fraction]:
     """
     Cached function to return a list of timecodes for vfr clips.
 
@@ -310,7 +987,7 @@ def clip_to_timecodes(src_clip: vs.VideoNode) -> Deque[float]:
     length and the source filter used.
 
     Subsequent calls on the same clip will return the previously generated list of timecodes.
-    The timecodes are `floats` representing seconds from the start of the `src_clip`.
+    The timecodes are exact :class:`fractions.Fraction` s representing seconds from the start of the `src_clip`.
 
     If you have ``rich`` installed, will output a pretty progress bar as this process can take a long time.
     """
@@ -322,14 +999,14 @@ def clip_to_timecodes(src_clip: vs.VideoNode) -> Deque[float]:
         track = lambda x, description, total: x  # type: ignore
         rich = False
     # fmt: on
-    timecodes = collections.deque([0.0], maxlen=src_clip.num_frames + 1)
+    timecodes = collections.deque([fractions.Fraction()], maxlen=src_clip.num_frames + 1)
     curr_time = fractions.Fraction()
     init_percentage = 0
     for frame in track(src_clip.frames(), description="Finding timestamps...", total=src_clip.num_frames):
         num = cast(int, frame.props["_DurationNum"])
         den = cast(int, frame.props["_DurationDen"])
         curr_time += fractions.Fraction(num, den)
-        timecodes.append(float(curr_time))
+        timecodes.append(curr_time)
         if rich:
             pass  # if ran in a normal console/terminal, should render a pretty progress bar
         else:
@@ -388,8 +1065,530 @@ def _check_ordered(starts: List[int], ends: List[int]) -> bool:
     return True
 
 
+def _resolve_trims(num_frames: int, trims: Union[List[Trim], Trim], caller: str) -> List[Tuple[int, int]]:
+    """
+    Validates user-given trims and converts them to positive ``(start, end)`` frame ranges.
+
+    Returns an empty list for a ``(None, None)`` trim, which causes no trimming.
+    """
+    if not isinstance(trims, (list, tuple)):
+        raise TypeError(f"{caller}: trims must be a list of 2-tuples (or just one 2-tuple)")
+
+    if len(trims) == 1 and isinstance(trims, list):
+        warn(
+            f"{caller}: using a list of one 2-tuple is not recommended; for a single trim,"
+            "directly use a tuple: `trims=(5,-2)` instead of `trims=[(5,-2)]`",
+            SyntaxWarning,
+        )
+        if isinstance(trims[0], tuple):
+            trims = trims[0]  # convert nested tuple in a list to just the tuple
+        else:
+            raise TypeError(f"{caller}: the inner trim must be a tuple")
+    if isinstance(trims, tuple):
+        if len(trims) != 2:
+            raise ValueError(f"{caller}: a single tuple trim must have 2 elements")
+        if not all(isinstance(i, (int, type(None))) for i in trims):
+            raise TypeError(f"{caller}: the trim must contain only 2 ints or Nones")
+        if trims[-1] == 0:
+            raise ValueError(f"{caller}: slices cannot end with 0, if attempting to use an empty slice, use `None`")
+        if trims == (None, None):
+            return []
+    elif isinstance(trims, list):
+        for trim in trims:
+            if not isinstance(trim, tuple):
+                raise TypeError(f"{caller}: the trim {trim} is not a tuple")
+            if len(trim) != 2:
+                raise ValueError(f"{caller}: the trim {trim} needs 2 elements")
+            for i in trim:
+                if not isinstance(i, (int, type(None))):
+                    raise TypeError(f"{caller}: the trim {trim} must have 2 ints or None's")
+            if trim[-1] == 0:
+                raise ValueError(f"{caller}: slices cannot end with 0, if attempting to use an empty slice, use `None`")
+
+    # --- single trim --------------------------------------------------------------------------------------------------
+    if isinstance(trims, tuple):
+        start, end = _negative_to_positive(num_frames, *trims)
+        if TYPE_CHECKING:
+            assert isinstance(start, int)
+            assert isinstance(end, int)
+        if end <= start:
+            raise ValueError(f"{caller}: the trim is not logical")
+        return [(start, end)]
+
+    # --- multiple trims -----------------------------------------------------------------------------------------------
+    starts, ends = _negative_to_positive(num_frames, [s for s, e in trims], [e for s, e in trims])
+    if TYPE_CHECKING:
+        assert isinstance(starts, list)
+        assert isinstance(ends, list)
+    if not _check_ordered(starts, ends):
+        raise ValueError(f"{caller}: the trims are not logical")
+    return list(zip(starts, ends))
+
+
+def _find_ffmpeg(ffmpeg_path: Optional[str], caller: str) -> str:
+    """Returns the path to the ffmpeg executable, looking it up in `PATH` if `ffmpeg_path` is not given."""
+    if ffmpeg_path is None:
+        if not which("ffmpeg"):
+            raise FileNotFoundError(f"{caller}: ffmpeg executable not found in PATH")
+        else:
+            ffmpeg_path = which("ffmpeg")
+    else:
+        if not os.path.isfile(ffmpeg_path):
+            raise FileNotFoundError(f"{caller}: ffmpeg executable at {ffmpeg_path} not found")
+    if TYPE_CHECKING:
+        assert isinstance(ffmpeg_path, str)
+    return ffmpeg_path
+
+
+def _find_ffprobe(ffmpeg_path: Optional[str], caller: str) -> str:
+    """Returns the path to the ffprobe executable next to `ffmpeg_path`, or in `PATH`."""
+    if ffmpeg_path is not None:
+        head, tail = os.path.split(ffmpeg_path)
+        if os.path.isfile(sibling := os.path.join(head, tail.replace("ffmpeg", "ffprobe"))):
+            return sibling
+    if not (ffprobe_path := which("ffprobe")):
+        raise FileNotFoundError(f"{caller}: ffprobe executable not found in PATH")
+    return ffprobe_path
+
+
+class _AudioInfo(NamedTuple):
+    codec: str  # FFmpeg's codec name (i.e. ``pcm_s24le``, ``flac``)
+    sample_rate: int
+    channels: int
+    sample_fmt: str  # FFmpeg's decoded sample format (i.e. ``s32``, ``fltp``)
+    bits: int  # bits actually used per sample, 0 if unknown
+    channel_layout: str = ""  # FFmpeg's channel layout name (i.e. ``5.1(side)``), empty if unknown
+    duration: Optional[fractions.Fraction] = None  # seconds, None if unknown
+    exact_duration: bool = False  # False if `duration` was estimated (i.e. from the bitrate of a raw stream)
+
+    def __str__(self) -> str:
+        return f"{self.codec}, {self.sample_rate} Hz, {self.channels} channels, {self.sample_fmt}"
+
+    @property
+    def stream_params(self) -> Tuple[str, int, int, str, int, str]:
+        """Everything but the duration, i.e. what has to match for files to be joined."""
+        return self.codec, self.sample_rate, self.channels, self.sample_fmt, self.bits, self.channel_layout
+
+
+def _probe_audio(path: str, ffmpeg_path: Optional[str] = None) -> _AudioInfo:
+    """
+    Reads the stream parameters and duration of the first audio stream of `path`,
+    natively for WAV and with ffprobe otherwise.
+
+    The duration is exact for WAV and for containers that store it,
+    for raw elementary streams (i.e. ADTS AAC, AC-3, DTS) ffprobe can only estimate it.
+
+    Results are cached for as long as the file's modification time and size stay the same.
+    """
+    stat = os.stat(path)
+    return _probe_audio_cached(os.path.abspath(path), stat.st_mtime_ns, stat.st_size, ffmpeg_path)
+
+
+@functools.lru_cache(maxsize=256)
+def _probe_audio_cached(path: str, mtime_ns: int, size: int, ffmpeg_path: Optional[str]) -> _AudioInfo:
+    try:
+        wav = _read_wav_header(path)
+        duration = fractions.Fraction(wav.data_size // wav.block_align, wav.sample_rate)
+        return _AudioInfo(
+            wav.codec, wav.sample_rate, wav.channels, wav.sample_fmt, wav.bits, duration=duration, exact_duration=True
+        )
+    except ValueError:
+        pass
+    ffprobe_path = _find_ffprobe(ffmpeg_path, "_probe_audio")
+    args = [ffprobe_path, "-v", "warning", "-select_streams", "a:0", "-of", "json"]  # warning: for the estimate note
+    entries = (
+        "stream=codec_name,sample_rate,channels,channel_layout,sample_fmt,bits_per_raw_sample,bits_per_sample,duration"
+        ":format=format_name,duration"
+    )
+    proc = run(args + ["-show_entries", entries, path], capture_output=True, text=True)
+    probe = json.loads(proc.stdout or "{}")
+    streams = probe.get("streams")
+    if proc.returncode or not streams:
+        raise ValueError(f"_probe_audio: no audio stream found in {path}")
+    stream = streams[0]
+    bits = 0
+    for key in ("bits_per_raw_sample", "bits_per_sample"):  # bits_per_raw_sample is the most accurate when set
+        if str(stream.get(key)).isdigit() and int(stream[key]):
+            bits = int(stream[key])
+            break
+    duration = None
+    for value in (stream.get("duration"), probe.get("format", {}).get("duration")):  # Matroska only has the latter
+        try:
+            duration = fractions.Fraction(value)
+            break
+        except (TypeError, ValueError):  # missing or 'N/A'
+            pass
+    estimated = (
+        "Estimating duration from bitrate" in proc.stderr
+        or probe.get("format", {}).get("format_name") in _RAW_AUDIO_FORMATS
+    )
+    return _AudioInfo(
+        stream["codec_name"],
+        int(stream["sample_rate"]),
+        int(stream["channels"]),
+        stream.get("sample_fmt", ""),
+        bits,
+        stream.get("channel_layout", ""),
+        duration,
+        duration is not None and not estimated,
+    )
+
+
+def _check_audio_length(
+    frames: List[Tuple[int, int]],
+    ft: Callable[[int], fractions.Fraction],
+    audio_duration: fractions.Fraction,
+    exact: bool,
+    audio_file: str,
+    caller: str,
+) -> None:
+    """
+    Raises if a trim needs audio past the end of `audio_file`, or only warns if `audio_duration` is an estimate.
+
+    Audio ending within the last frame of a trim is accepted, as audio tracks are rarely exactly as long as the video.
+    """
+    for s, e in frames:
+        if ft(e - 1) >= audio_duration:
+            if not exact:
+                warn(
+                    f"{caller}: the trim ({s}, {e}) ends at {float(ft(e)):.3f}s but {audio_file} is estimated "
+                    f"to be only {float(audio_duration):.3f}s long",
+                    Warning,
+                )
+                return
+            raise ValueError(
+                f"{caller}: the trim ({s}, {e}) ends at {float(ft(e)):.3f}s "
+                f"but {audio_file} is only {float(audio_duration):.3f}s long"
+            )
+
+
+_ROUNDING: Dict[str, Callable[[fractions.Fraction], int]] = {
+    "round": round,  # half to even, like Python's round()
+    "half_up": lambda x: math.floor(x + fractions.Fraction(1, 2)),
+    "floor": math.floor,
+    "ceil": math.ceil,
+}
+
+
+def _format_ts(t: fractions.Fraction, precision: int = 3, rounding: str = "round") -> str:
+    """
+    Formats an exact time in seconds as a ``HH:MM:SS.sss`` timestamp with `precision` (0, 3, 6 or 9) decimals.
+
+    The time is rounded once to an integer number of ticks (``10 ** -precision`` seconds), the rest is integer math.
+    """
+    ticks_per_second = 10**precision
+    ticks = _ROUNDING[rounding](t * ticks_per_second)
+    m, ticks = divmod(ticks, 60 * ticks_per_second)
+    h, m = divmod(m, 60)
+    s, frac = divmod(ticks, ticks_per_second)
+    if precision == 0:
+        return f"{h:02}:{m:02}:{s:02}"
+    return f"{h:02}:{m:02}:{s:02}.{frac:0{precision}}"
+
+
+def _read_timecodes(timecodes_file: str) -> List[fractions.Fraction]:
+    """Exact times in seconds from a v2 timecodes file, cached while the file's modification time and size match."""
+    stat = os.stat(timecodes_file)
+    return _read_timecodes_cached(os.path.abspath(timecodes_file), stat.st_mtime_ns, stat.st_size)
+
+
+@functools.lru_cache(maxsize=16)
+def _read_timecodes_cached(path: str, mtime_ns: int, size: int) -> List[fractions.Fraction]:
+    with open(path, "r") as f:
+        lines = f.read().splitlines()[1:]  # first line is the '# timecode format v2' header
+    return [fractions.Fraction(line.strip()) / 1000 for line in lines if line.strip()]
+
+
+def _chunk_range(
+    start: int,
+    end: int,
+    start_time: fractions.Fraction,
+    end_time: fractions.Fraction,
+    chunk_seconds: fractions.Fraction,
+) -> List[Tuple[int, int, fractions.Fraction, fractions.Fraction, int]]:
+    """Splits the time range of a trim into chunks of at most `chunk_seconds` (the last chunk takes the remainder)."""
+    if chunk_seconds <= 0:
+        raise ValueError("_chunk_range: chunk_seconds must be positive")
+    bounds = [start_time]
+    while bounds[-1] + chunk_seconds < end_time:
+        bounds.append(bounds[-1] + chunk_seconds)
+    bounds.append(end_time)
+    return [(start, end, a, b, chunk) for chunk, (a, b) in enumerate(zip(bounds, bounds[1:]))]
+
+
+def _lossless_codec_args(info: "_AudioInfo", ext: str) -> List[str]:
+    """FFmpeg codec arguments that encode audio described by `info` to `ext` without losing precision."""
+    sample_fmt = info.sample_fmt.rstrip("p")  # planar or not makes no difference here
+    if sample_fmt in ("flt", "dbl"):
+        if ext == ".flac":
+            raise ValueError("_lossless_codec_args: floating-point audio cannot be stored losslessly in FLAC")
+        codec = "pcm_f32le" if sample_fmt == "flt" else "pcm_f64le"
+    else:
+        bits = info.bits or {"u8": 8, "s16": 16, "s32": 32, "s64": 64}.get(sample_fmt, 32)
+        bits = next(b for b in (8, 16, 24, 32, 64) if bits <= b)
+        if ext == ".flac":
+            if bits > 24:
+                raise ValueError(f"_lossless_codec_args: {bits}-bit audio cannot be encoded to FLAC by FFmpeg")
+            bits = max(bits, 16)
+            return ["-c:a", "flac", "-sample_fmt", "s16" if bits == 16 else "s32", "-bits_per_raw_sample", str(bits)]
+        codec = "pcm_u8" if bits == 8 else f"pcm_s{bits}le"
+    return ["-c:a", codec] + (["-rf64", "auto"] if ext == ".wav" else [])
+
+
+def _concat_list(files: List[str]) -> str:
+    """File list for FFmpeg's concat demuxer when it is read from a pipe (see `_CONCAT_DEMUXER_ARGS`)."""
+    # relative paths would be resolved against 'pipe:', so use absolute file: URLs, escaping quotes for the demuxer
+    return "".join("file 'file:" + os.path.abspath(file).replace("'", "'\\''") + "'\n" for file in files)
+
+
+def _copy_range(src: BinaryIO, dst: BinaryIO, offset: int, count: int) -> None:
+    """
+    Appends `count` bytes of `src`, starting at `offset`, to the unbuffered `dst`.
+
+    Uses :func:`os.sendfile` so the data never leaves the kernel where possible,
+    falling back to a plain read/write loop (i.e. on platforms that can only ``sendfile`` to sockets).
+    """
+    if hasattr(os, "sendfile"):
+        try:
+            while count > 0 and (sent := os.sendfile(dst.fileno(), src.fileno(), offset, count)):
+                offset += sent
+                count -= sent
+            return
+        except OSError:
+            pass
+    src.seek(offset)
+    while count > 0 and (buf := src.read(min(count, 1 << 20))):
+        dst.write(buf)
+        count -= len(buf)
+
+
+class _ProgressTracker:
+    """Turns per-step FFmpeg progress into :class:`Progress` reports for the user's callback. Thread-safe."""
+
+    def __init__(self, callback: Optional[Callable[[Progress], None]], durations: List[float]) -> None:
+        self.callback = callback
+        self.durations = durations
+        self.out_times = [0.0] * len(durations)
+        self.lock = threading.Lock()
+
+    def step(self, segment: Optional[int]) -> Optional[Callable[[float, Optional[float], int, bool], None]]:
+        """Returns the `on_progress` hook for :func:`_run_ffmpeg` reporting on `segment`."""
+        if self.callback is None:
+            return None
+        return functools.partial(self.update, segment)
+
+    def piece_hook(self, pieces: List[Tuple[str, int, int]], cancel: Optional[CancelToken]) -> Callable[[int], None]:
+        """Returns the `on_piece` hook for :func:`_write_wav`, reporting each piece as a finished segment."""
+
+        def on_piece(key: int) -> None:
+            if key < len(pieces) and cancel is not None and cancel.cancelled:
+                raise futures.CancelledError("_write_wav: cancelled")
+            if key > 0 and self.callback is not None:
+                self.update(key - 1, self.durations[key - 1], None, pieces[key - 1][2], True)
+
+        return on_piece
+
+    def update(self, segment: Optional[int], out_time: float, speed: Optional[float], size: int, done: bool) -> None:
+        if TYPE_CHECKING:
+            assert self.callback is not None
+        total_duration = sum(self.durations) if self.durations else None
+        with self.lock:
+            if segment is None:
+                duration, total_time = total_duration, out_time
+            else:
+                duration = self.durations[segment]
+                self.out_times[segment] = duration if done else min(out_time, duration)
+                total_time = sum(self.out_times)
+            self.callback(Progress(segment, out_time, duration, total_time, total_duration, speed, size, done))
+
+
+def _run_ffmpeg(
+    args: List[str],
+    *,
+    stdin: Optional[str] = None,
+    on_progress: Optional[Callable[[float, Optional[float], int, bool], None]] = None,
+    cancel: Optional[CancelToken] = None,
+) -> None:
+    """
+    Runs FFmpeg, optionally reading its ``-progress`` output and watching for cancellation.
+
+    `stdin` is written to FFmpeg's standard input (i.e. a file list for ``-i pipe:0``).
+    `on_progress` is called with ``(out_time, speed, total_size, done)`` for every progress block FFmpeg writes.
+    If `cancel` is triggered, FFmpeg is terminated, its (last argument) output file is removed if this call created it,
+    and :class:`concurrent.futures.CancelledError` is raised.
+    If `on_progress` raises, FFmpeg is stopped the same way and the exception is re-raised here.
+    """
+    if on_progress is None and cancel is None:
+        run(args, input=stdin, text=True)
+        return
+    if cancel is not None and cancel.cancelled:
+        raise futures.CancelledError(f"_run_ffmpeg: {args[-1]} was cancelled")
+
+    args = args[:1] + ["-progress", "pipe:1", "-nostats"] + args[1:]
+    token = cancel if cancel is not None else CancelToken()
+    errors: List[BaseException] = []
+    existed = os.path.exists(args[-1])
+    with Popen(args, stdin=DEVNULL if stdin is None else PIPE, stdout=PIPE, text=True) as proc:
+        reader = threading.Thread(target=_read_progress, args=(proc.stdout, on_progress, errors), daemon=True)
+        reader.start()
+        if stdin is not None:
+            if TYPE_CHECKING:
+                assert proc.stdin is not None
+            proc.stdin.write(stdin)
+            proc.stdin.close()
+        cancelled = False
+        while proc.poll() is None and not errors and not cancelled:
+            cancelled = token.wait(0.1)
+        stopped = proc.poll() is None
+        if stopped:
+            proc.terminate()
+            proc.wait()
+        reader.join()
+    if (cancelled or stopped) and not existed and os.path.isfile(args[-1]):
+        os.remove(args[-1])
+    if errors:
+        raise errors[0]
+    if cancelled:
+        raise futures.CancelledError(f"_run_ffmpeg: {args[-1]} was cancelled")
+
+
+def _read_progress(
+    stream: IO[str],
+    on_progress: Optional[Callable[[float, Optional[float], int, bool], None]],
+    errors: List[BaseException],
+) -> None:
+    """
+    Parses the ``key=value`` blocks of FFmpeg's ``-progress`` output (each block ends with a ``progress`` key).
+
+    The stream is always read until EOF, so FFmpeg never blocks on a full pipe.
+    If `on_progress` raises, it is not called again and the exception is appended to `errors`.
+    """
+    block: Dict[str, str] = {}
+    for line in stream:
+        key, _, value = line.strip().partition("=")
+        block[key] = value
+        if key != "progress":
+            continue
+        if on_progress is not None and not errors:
+            out_time = int(block["out_time_us"]) / 10**6 if block.get("out_time_us", "N/A") != "N/A" else 0.0
+            speed = float(block["speed"].rstrip("x")) if block.get("speed", "N/A").rstrip("x") != "N/A" else None
+            size = int(block["total_size"]) if block.get("total_size", "N/A") != "N/A" else 0
+            try:
+                on_progress(out_time, speed, size, value == "end")
+            except Exception as e:
+                errors.append(e)
+        block = {}
+
+
+class _WavHeader(NamedTuple):
+    fmt: bytes  # raw payload of the 'fmt ' chunk
+    format_tag: int  # 1 for integer PCM, 3 for IEEE float (resolved from the sub-format of WAVE_FORMAT_EXTENSIBLE)
+    bits: int
+    sample_rate: int
+    channels: int
+    block_align: int
+    data_offset: int
+    data_size: int
+
+    @property
+    def sample_fmt(self) -> str:
+        """FFmpeg's name for the decoded sample format (i.e. ``s32`` for 24-bit)."""
+        if self.format_tag == 3:
+            return "flt" if self.bits == 32 else "dbl"
+        return "u8" if self.bits == 8 else "s16" if self.bits <= 16 else "s32" if self.bits <= 32 else "s64"
+
+    @property
+    def codec(self) -> str:
+        """FFmpeg's name for the codec (i.e. ``pcm_s24le``)."""
+        if self.format_tag == 3:
+            return f"pcm_f{self.bits}le"
+        return "pcm_u8" if self.bits == 8 else f"pcm_s{self.bits}le"
+
+
+def _read_wav_header(path: str) -> _WavHeader:
+    """Locates the format description and PCM data of a RIFF/RF64 WAV file."""
+    with open(path, "rb") as f:
+        riff = f.read(12)
+        if len(riff) < 12 or riff[:4] not in (b"RIFF", b"RF64") or riff[8:] != b"WAVE":
+            raise ValueError(f"_read_wav_header: {path} is not a WAV file")
+        fmt, ds64_data_size = b"", None
+        while len(header := f.read(8)) == 8:
+            chunk_id, chunk_size = header[:4], struct.unpack("<I", header[4:])[0]
+            if chunk_id == b"ds64":
+                ds64 = f.read(chunk_size)
+                ds64_data_size = struct.unpack("<Q", ds64[8:16])[0]
+                f.seek(chunk_size % 2, os.SEEK_CUR)
+            elif chunk_id == b"fmt ":
+                fmt = f.read(chunk_size)
+                f.seek(chunk_size % 2, os.SEEK_CUR)
+            elif chunk_id == b"data":
+                if not fmt:
+                    raise ValueError(f"_read_wav_header: {path} has no format chunk before its data")
+                format_tag, channels, sample_rate, _, block_align, bits = struct.unpack("<HHIIHH", fmt[:16])
+                if format_tag == 0xFFFE and len(fmt) >= 26:
+                    format_tag = struct.unpack("<H", fmt[24:26])[0]  # first two bytes of the sub-format GUID
+                if format_tag not in (0x0001, 0x0003):
+                    raise ValueError(f"_read_wav_header: {path} does not contain uncompressed PCM")
+                if chunk_size == 0xFFFFFFFF and ds64_data_size is not None:
+                    chunk_size = ds64_data_size
+                data_offset = f.tell()
+                # streamed WAVs (and some broken muxers) write a bogus data size, trust the actual file size instead
+                data_size = min(chunk_size, os.fstat(f.fileno()).st_size - data_offset)
+                data_size -= data_size % block_align
+                return _WavHeader(fmt, format_tag, bits, sample_rate, channels, block_align, data_offset, data_size)
+            else:
+                f.seek(chunk_size + chunk_size % 2, os.SEEK_CUR)
+    raise ValueError(f"_read_wav_header: {path} has no data chunk")
+
+
+def _write_wav(
+    outfile: str,
+    fmt: bytes,
+    pieces: List[Tuple[str, int, int]],
+    *,
+    on_piece: Optional[Callable[[int], None]] = None,
+) -> None:
+    """
+    Writes a WAV file whose PCM data is the concatenation of `pieces`.
+
+    Each piece is a ``(path, offset, length)`` byte range of an existing file.
+    `on_piece` is called with the index of each piece before it is copied,
+    and once more with ``len(pieces)`` at the end.
+    Outputs larger than 4 GiB are written as RF64, like FFmpeg's ``-rf64 auto``.
+    """
+    data_size = sum(length for _, _, length in pieces)
+    pad = data_size % 2
+    riff_size = 4 + (8 + len(fmt) + len(fmt) % 2) + (8 + data_size + pad)
+    with open(outfile, "xb", buffering=0) as out:
+        if riff_size > 0xFFFFFFFF:
+            riff_size += 8 + 28
+            out.write(b"RF64" + struct.pack("<I", 0xFFFFFFFF) + b"WAVE")
+            out.write(b"ds64" + struct.pack("<IQQQI", 28, riff_size, data_size, 0, 0))
+            data_header = b"data" + struct.pack("<I", 0xFFFFFFFF)
+        else:
+            out.write(b"RIFF" + struct.pack("<I", riff_size) + b"WAVE")
+            data_header = b"data" + struct.pack("<I", data_size)
+        out.write(b"fmt " + struct.pack("<I", len(fmt)) + fmt + b"\0" * (len(fmt) % 2))
+        out.write(data_header)
+        for key, (path, offset, length) in enumerate(pieces):
+            if on_piece is not None:
+                on_piece(key)
+            with open(path, "rb") as src:
+                _copy_range(src, out, offset, length)
+        out.write(b"\0" * pad)
+    if on_piece is not None:
+        on_piece(len(pieces))
+
+
 def concat(
-    audio_files: List[str], outfile: str, *, ffmpeg_path: Optional[str] = None, quiet: bool = False, debug: bool = False
+    audio_files: List[str],
+    outfile: str,
+    *,
+    ffmpeg_path: Optional[str] = None,
+    quiet: bool = False,
+    progress: Optional[Callable[[Progress], None]] = None,
+    cancel: Optional[CancelToken] = None,
+    debug: bool = False,
 ) -> Optional[Dict]:
     """Function to concatenate mutliple audio files.
 
@@ -400,18 +1599,18 @@ def concat(
     :param ffmpeg_path: Set this if ``ffmpeg`` is not in your `PATH`.
                         If ``ffmpeg`` exists in your `PATH`, it will automatically be detected and used.
     :param quiet: Suppresses most console output from FFmpeg.
+    :param progress: Called with a :class:`Progress` every time FFmpeg reports progress
+                     (or once per input file for natively joined WAV).
+    :param cancel: A :class:`CancelToken`. Cancelling it from another thread stops FFmpeg,
+                   removes the partial `outfile` and raises :class:`concurrent.futures.CancelledError`.
+
+    Before anything is written, all inputs are probed concurrently and must share codec, sample rate and channels.
+    Probing non-WAV inputs needs ``ffprobe``; if an input cannot be probed, a warning is shown and FFmpeg is left to
+    reject mismatched inputs, like :func:`plan_trim` does.
+    WAV inputs with identical formats are joined natively by splicing their PCM data, without FFmpeg.
     """
     # --- checking for ffmpeg ------------------------------------------------------------------------------------------
-    if ffmpeg_path is None:
-        if not which("ffmpeg"):
-            raise FileNotFoundError("concat: ffmpeg executable not found in PATH")
-        else:
-            ffmpeg_path = which("ffmpeg")
-    else:
-        if not os.path.isfile(ffmpeg_path):
-            raise FileNotFoundError(f"concat: ffmpeg executable at {ffmpeg_path} not found")
-    if TYPE_CHECKING:
-        assert isinstance(ffmpeg_path, str)
+    ffmpeg_path = _find_ffmpeg(ffmpeg_path, "concat")
 
     # --- checking for filename issues and file extension support ------------------------------------------------------
     if len(audio_files) < 2:
@@ -421,26 +1620,52 @@ def concat(
         raise ValueError("concat: all files must have the same extension")
     if (ext := audio_file_extensions.pop()) not in VALID_FFMPEG_EXTENSIONS:
         raise ValueError(f"concat: '{ext}' is not a valid extension recognized by any known FFmpeg encoders")
-    for af in audio_files:
-        if not os.path.isfile(af):
-            raise FileNotFoundError(f"concat: {af} not found")
     if os.path.isfile(outfile):
         raise FileExistsError(f"concat: {outfile} already exists")
     # ------------------------------------------------------------------------------------------------------------------
 
     ffmpeg_silence = [ffmpeg_path, "-hide_banner", "-loglevel", "16"] if quiet else [ffmpeg_path, "-hide_banner"]
-
-    if os.path.isfile("_acsuite_temp_concat.txt"):
-        raise FileExistsError("concat: _acsuite_temp_concat.txt already exists, quitting")
-    if not debug:
-        concat_file = open("_acsuite_temp_concat.txt", "w")
-        for af in audio_files:
-            concat_file.write(f"file {af}\n")
-
-        concat_file.close()
-    args = ffmpeg_silence + ["-f", "concat", "-i", "_acsuite_temp_concat.txt", "-c", "copy", outfile]
+    concat_list = _concat_list(audio_files)
+    args = ffmpeg_silence + _CONCAT_DEMUXER_ARGS + ["-c", "copy", outfile]
     if debug:
         return locals()
-    run(args)
 
-    os.remove("_acsuite_temp_concat.txt")
+    # --- checking that the inputs exist and can be joined -------------------------------------------------------------
+    for af in audio_files:
+        if not os.path.isfile(af):
+            raise FileNotFoundError(f"concat: {af} not found")
+
+    def probe(af: str) -> Optional[_AudioInfo]:
+        try:
+            return _probe_audio(af, ffmpeg_path)
+        except (ValueError, FileNotFoundError):  # not an audio file ffprobe understands, or no ffprobe at all
+            return None
+
+    with futures.ThreadPoolExecutor() as pool:
+        infos = list(pool.map(probe, audio_files))
+    if None in infos:
+        af = audio_files[infos.index(None)]
+        warn(f"concat: could not probe {af}, the inputs are not checked before joining", Warning)
+    else:
+        probed = cast(List[_AudioInfo], infos)
+        for af, info in zip(audio_files[1:], probed[1:]):
+            if info.stream_params != probed[0].stream_params:
+                raise ValueError(f"concat: {af} ({info}) does not match {audio_files[0]} ({probed[0]})")
+
+    # --- WAV with identical formats, spliced natively -----------------------------------------------------------------
+    try:
+        wavs = [_read_wav_header(af) for af in audio_files] if ext == ".wav" else []
+    except ValueError:
+        wavs = []
+    if wavs and all(wav.fmt == wavs[0].fmt for wav in wavs):
+        tracker = _ProgressTracker(progress, [wav.data_size / wav.block_align / wav.sample_rate for wav in wavs])
+        pieces = [(af, wav.data_offset, wav.data_size) for af, wav in zip(audio_files, wavs)]
+        try:
+            _write_wav(outfile, wavs[0].fmt, pieces, on_piece=tracker.piece_hook(pieces, cancel))
+        except futures.CancelledError:
+            os.remove(outfile)
+            raise
+        return None
+
+    # --- everything else goes through ffmpeg's concat demuxer ---------------------------------------------------------
+    _run_ffmpeg(args, stdin=concat_list, on_progress=_ProgressTracker(progress, []).step(None), cancel=cancel)
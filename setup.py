@@ -26,7 +26,8 @@ setuptools.setup(
     license='UNLICENSE',
     install_requires=install_requires,
     extras_require={
-        "VFR Progress Bar": ['rich>=6.1.2']
+        "VFR Progress Bar": ['rich>=6.1.2'],
+        "NumPy Output": ['numpy'],
     },
     classifiers=[
         "Intended Audience :: End Users/Desktop",
@@ -1,6 +1,12 @@
+import io
 import os
 import shutil
+import sys
+import tempfile
+import time
 import unittest
+import wave
+from concurrent import futures
 from fractions import Fraction
 
 import vapoursynth as vs
@@ -71,6 +77,32 @@ class ACsuiteTests(unittest.TestCase):
         self.assertEqual(acsuite.f2ts(10000, src_clip=self.VFR_CLIP), "00:06:57.083")
         self.assertEqual(acsuite.f2ts(25000, src_clip=self.VFR_CLIP), "00:17:14.367")
 
+    def test_frame_time_and_rounding(self):
+        self.assertEqual(acsuite.frame_time(69, src_clip=self.BLANK_CLIP), Fraction(69, 5))
+        self.assertEqual(acsuite.frame_time(-1, src_clip=self.BLANK_CLIP), Fraction(99, 5))
+        self.assertEqual(acsuite.frame_time(1, src_clip=self.VFR_CLIP), Fraction(1001, 24000))
+
+        self.assertEqual(acsuite.f2ts(1, src_clip=self.VFR_CLIP, precision=9), "00:00:00.041708333")
+        self.assertEqual(acsuite.f2ts(1, src_clip=self.VFR_CLIP, precision=9, rounding="ceil"), "00:00:00.041708334")
+        self.assertEqual(acsuite.f2ts(1, src_clip=self.VFR_CLIP, rounding="floor"), "00:00:00.041")
+        self.assertEqual(acsuite.f2ts(1, src_clip=self.VFR_CLIP, rounding="ceil"), "00:00:00.042")
+        self.assertEqual(acsuite.f2ts(5, src_clip=self.BLANK_CLIP, precision=0), "00:00:01")
+        self.assertEqual(acsuite._format_ts(Fraction(5, 2), precision=0), "00:00:02")
+        self.assertEqual(acsuite._format_ts(Fraction(5, 2), precision=0, rounding="half_up"), "00:00:03")
+        self.assertEqual(acsuite._format_ts(Fraction(3600 * 25 * 1000 - 1, 1000)), "24:59:59.999")
+        with self.assertRaisesRegex(ValueError, "rounding"):
+            acsuite.f2ts(1, src_clip=self.BLANK_CLIP, rounding="nearest")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            timecodes_file = os.path.join(tmp, "timecodes.txt")
+            with open(timecodes_file, "w") as f:
+                f.write("# timecode format v2\n0.000000\n41.708333\n83.416667\n")
+            self.assertEqual(
+                acsuite.frame_time(1, src_clip=self.VFR_CLIP, timecodes_file=timecodes_file), Fraction(41708333, 10**9)
+            )
+            self.assertEqual(acsuite.f2ts(2, src_clip=self.VFR_CLIP, timecodes_file=timecodes_file), "00:00:00.083")
+            self.assertIs(acsuite._read_timecodes(timecodes_file), acsuite._read_timecodes(timecodes_file))
+
     def test_eztrim(self):
         with self.assertRaisesRegex(FileNotFoundError, "not found"):
             acsuite.eztrim(self.BLANK_CLIP, (None, None), "non_existent_file.wav")
@@ -121,40 +153,29 @@ class ACsuiteTests(unittest.TestCase):
 
         # --------------------------------------------------------------------------------------------------------------
 
-        temp_file = open("_acsuite_temp_concat.txt", "w")
-        temp_file.write("t")
-        temp_file.close()
-
-        with self.assertRaisesRegex(FileExistsError, "exists"):
-            acsuite.eztrim(self.BLANK_CLIP, [(None, -1), (None, -1)], "test_wav_audio.wav", "outfile.wav")
-
-        os.remove("_acsuite_temp_concat.txt")
-
-        # --------------------------------------------------------------------------------------------------------------
-
         self.assertEqual(
             acsuite.eztrim(self.BLANK_CLIP, (None, None), "test_wav_audio.wav", "outfile.wav"), "outfile.wav"
         )
 
         # --------------------------------------------------------------------------------------------------------------
 
-        none_none_test_locals = acsuite.eztrim(
-            self.BLANK_CLIP, (None, None), "test_wav_audio.wav", "outfile.xxx", debug=True
-        )
+        none_none_plan = acsuite.plan_trim(self.BLANK_CLIP, (None, None), "test_wav_audio.wav", "outfile.xxx")
 
-        self.assertEqual(none_none_test_locals["trims"], (None, None))
-        self.assertEqual(none_none_test_locals["ffmpeg_path"], shutil.which("ffmpeg"))
-        self.assertEqual(none_none_test_locals["audio_file_name"], "test_wav_audio")
-        self.assertEqual(none_none_test_locals["audio_file_ext"], ".wav")
-        self.assertEqual(none_none_test_locals["codec_args"], ["-c:a", "copy", "-rf64", "auto"])
+        self.assertEqual(none_none_plan.segments, [])
+        self.assertEqual(none_none_plan.ffmpeg_path, shutil.which("ffmpeg"))
+        self.assertEqual(none_none_plan.audio_file, "test_wav_audio.wav")
+        self.assertEqual(none_none_plan.outfile, "outfile.wav")
+        self.assertEqual(none_none_plan.codec_args, ["-c:a", "copy", "-rf64", "auto"])
+        self.assertEqual(
+            acsuite.eztrim(self.BLANK_CLIP, (None, None), "test_wav_audio.wav", "outfile.xxx", debug=True),
+            none_none_plan.to_dict(),
+        )
 
-        single_test_locals = acsuite.eztrim(
-            self.VFR_CLIP, (10000, -29000), "test_wav_audio.wav", "outfile.xxx", debug=True, quiet=True
+        single_test_plan = acsuite.plan_trim(
+            self.VFR_CLIP, (10000, -29000), "test_wav_audio.wav", "outfile.xxx", quiet=True
         )
 
-        self.assertEqual(single_test_locals["trims"], (10000, -29000))
-        self.assertEqual(single_test_locals["num_frames"], self.VFR_CLIP.num_frames)
-        self.assertEqual((single_test_locals["start"], single_test_locals["end"]), (10000, 25000))
+        self.assertEqual(single_test_plan.frames, [(10000, 25000)])
         single_test_args = (
             [shutil.which("ffmpeg"), "-hide_banner", "-loglevel", "16"]
             + ["-i", "test_wav_audio.wav", "-vn", "-ss", "00:06:57.083", "-to", "00:17:14.367"]
@@ -162,28 +183,388 @@ class ACsuiteTests(unittest.TestCase):
             + ["outfile.wav"]
         )
 
-        self.assertEqual(single_test_locals["args"], single_test_args)
+        self.assertEqual(single_test_plan.segment_args(single_test_plan.segments[0]), single_test_args)
 
-        double_test_locals = acsuite.eztrim(
-            self.VFR_CLIP, [(None, 10000), (10000, -29000)], "test_wav_audio.wav", "outfile.xxx", debug=True
+        double_test_plan = acsuite.plan_trim(
+            self.VFR_CLIP, [(None, 10000), (10000, -29000)], "test_wav_audio.wav", "outfile.xxx"
         )
 
-        self.assertEqual(double_test_locals["starts"], [0, 10000])
-        self.assertEqual(double_test_locals["ends"], [10000, 25000])
+        self.assertEqual(double_test_plan.frames, [(0, 10000), (10000, 25000)])
         self.assertEqual(
-            double_test_locals["temp_filelist"], ["_acsuite_temp_output_0.wav", "_acsuite_temp_output_1.wav"]
+            [seg.outfile for seg in double_test_plan.segments],
+            ["_acsuite_temp_output_0.wav", "_acsuite_temp_output_1.wav"],
         )
 
         double_test_args = [shutil.which("ffmpeg"), "-hide_banner"] + [
             "-f",
             "concat",
+            "-safe",
+            "0",
+            "-protocol_whitelist",
+            "file,pipe",
             "-i",
-            "_acsuite_temp_concat.txt",
+            "pipe:0",
             "-c",
             "copy",
+            "-rf64",
+            "auto",
             "outfile.wav",
         ]
-        self.assertEqual(double_test_locals["args"], double_test_args)
+        self.assertEqual(double_test_plan.concat_args(), double_test_args)
+        self.assertEqual(
+            double_test_plan.concat_list(),
+            f"file 'file:{os.path.abspath('_acsuite_temp_output_0.wav')}'\n"
+            f"file 'file:{os.path.abspath('_acsuite_temp_output_1.wav')}'\n",
+        )
+
+    def test_trim_plan(self):
+        plan = acsuite.plan_trim(self.BLANK_CLIP, [(None, 10), (20, -10)], "test_wav_audio.wav", "outfile.wav")
+
+        self.assertEqual(plan.frames, [(0, 10), (20, 90)])
+        self.assertEqual(
+            [(seg.start_ts, seg.end_ts) for seg in plan.segments],
+            [("00:00:00.000", "00:00:02.000"), ("00:00:04.000", "00:00:18.000")],
+        )
+        self.assertEqual(
+            [(seg.start_time, seg.end_time) for seg in plan.segments],
+            [(0, 2), (4, 18)],
+        )
+        self.assertEqual(acsuite.TrimPlan.from_json(plan.to_json()), plan)
+
+        self.assertEqual(
+            acsuite.FiltergraphExecutor().graph(plan, 48000),
+            "[0:a]atrim=start_sample=0:end_sample=96000,asetpts=PTS-STARTPTS[a0];"
+            "[0:a]atrim=start_sample=192000:end_sample=864000,asetpts=PTS-STARTPTS[a1];"
+            "[a0][a1]concat=n=2:v=0:a=1[out]",
+        )
+        # 1/7 s is 142.857... samples at 1 kHz
+        plan_7fps = acsuite.plan_trim(
+            core.std.BlankClip(format=vs.YUV420P8, length=100, fpsnum=7, fpsden=1), (1, 2), "test_wav_audio.wav"
+        )
+        self.assertIn("atrim=start_sample=143:end_sample=286,", acsuite.FiltergraphExecutor().graph(plan_7fps, 1000))
+        plan_7fps.rounding = "floor"
+        self.assertIn("atrim=start_sample=142:end_sample=285,", acsuite.FiltergraphExecutor().graph(plan_7fps, 1000))
+
+        with self.assertRaises(TypeError):
+            acsuite.Executor()  # type: ignore
+
+        with self.assertRaisesRegex(ValueError, "only write WAV"):
+            acsuite.PCMExecutor().execute(acsuite.TrimPlan.from_dict({**plan.to_dict(), "outfile": "outfile.flac"}))
+        with self.assertRaisesRegex(ValueError, "not an uncompressed PCM WAV"):
+            acsuite.PCMExecutor().execute(plan)
+
+    def test_lossless_transcode(self):
+        info_24 = acsuite._AudioInfo("truehd", 48000, 6, "s32", 24)
+        info_flt = acsuite._AudioInfo("dts", 48000, 6, "fltp", 0)
+        self.assertEqual(acsuite._lossless_codec_args(info_24, ".wav"), ["-c:a", "pcm_s24le", "-rf64", "auto"])
+        self.assertEqual(acsuite._lossless_codec_args(info_24, ".w64"), ["-c:a", "pcm_s24le"])
+        self.assertEqual(
+            acsuite._lossless_codec_args(info_24, ".flac"),
+            ["-c:a", "flac", "-sample_fmt", "s32", "-bits_per_raw_sample", "24"],
+        )
+        self.assertEqual(acsuite._lossless_codec_args(info_flt, ".w64"), ["-c:a", "pcm_f32le"])
+        with self.assertRaisesRegex(ValueError, "FLAC"):
+            acsuite._lossless_codec_args(info_flt, ".flac")
+
+        self.assertEqual(
+            acsuite._chunk_range(0, 100, Fraction(1, 2), Fraction(600), Fraction(300)),
+            [(0, 100, Fraction(1, 2), Fraction(601, 2), 0), (0, 100, Fraction(601, 2), Fraction(600), 1)],
+        )
+        self.assertEqual(
+            acsuite._chunk_range(0, 100, Fraction(1, 2), Fraction(1), Fraction(300)),
+            [(0, 100, Fraction(1, 2), Fraction(1), 0)],
+        )
+
+        with self.assertRaisesRegex(ValueError, "lossless_ext"):
+            acsuite.plan_trim(self.BLANK_CLIP, (1, 5), "test_unknown_audio.zzz", lossless_ext=".mp3")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            audio_file = os.path.join(tmp, "audio.zzz")
+            with wave.open(audio_file, "wb") as w:
+                w.setnchannels(1)
+                w.setsampwidth(2)
+                w.setframerate(1000)
+                w.writeframes(bytes(2 * 20000))
+            with self.assertWarnsRegex(Warning, "transcoding"):
+                wav_plan = acsuite.plan_trim(self.BLANK_CLIP, (None, 50), audio_file, chunk_seconds=5)
+                w64_plan = acsuite.plan_trim(
+                    self.BLANK_CLIP, (None, 50), audio_file, chunk_seconds=5, lossless_ext=".w64"
+                )
+            self.assertEqual(len(wav_plan.segments), 2)
+            self.assertEqual(wav_plan.concat_args()[-5:], ["-c", "copy", "-rf64", "auto", wav_plan.outfile])
+            self.assertEqual(w64_plan.concat_args()[-3:], ["-c", "copy", w64_plan.outfile])
+
+            with self.assertWarnsRegex(Warning, "transcoding"):
+                flac_plan = acsuite.plan_trim(
+                    self.BLANK_CLIP, (None, 50), audio_file, chunk_seconds=5, lossless_ext=".flac"
+                )
+            filtergraph = acsuite.FiltergraphExecutor()
+            self.assertEqual(filtergraph.output_args(wav_plan), ["-c:a", "pcm_s16le", "-rf64", "auto"])
+            self.assertEqual(
+                filtergraph.output_args(flac_plan), ["-c:a", "flac", "-sample_fmt", "s16", "-bits_per_raw_sample", "16"]
+            )
+            self.assertEqual(acsuite.FiltergraphExecutor(["-c:a", "flac"]).output_args(wav_plan), ["-c:a", "flac"])
+
+    def test_audio_length(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            wav_file = os.path.join(tmp, "audio.wav")
+            with wave.open(wav_file, "wb") as w:
+                w.setnchannels(1)
+                w.setsampwidth(2)
+                w.setframerate(1000)
+                w.writeframes(bytes(2 * 9900))
+            outfile = os.path.join(tmp, "outfile.wav")
+
+            self.assertEqual(acsuite._probe_audio(wav_file).duration, Fraction(99, 10))
+            self.assertTrue(acsuite._probe_audio(wav_file).exact_duration)
+
+            plan = acsuite.plan_trim(self.BLANK_CLIP, (None, 50), wav_file, outfile)
+            self.assertEqual(plan.audio_duration, Fraction(99, 10))
+            self.assertEqual(plan.duration, Fraction(99, 10))
+            self.assertEqual(acsuite.TrimPlan.from_json(plan.to_json()), plan)
+            plan = acsuite.plan_trim(self.BLANK_CLIP, [(None, 10), (20, 45)], wav_file, outfile)
+            self.assertEqual(plan.duration, 7)
+
+            with self.assertRaisesRegex(ValueError, "only 9.900s long"):
+                acsuite.plan_trim(self.BLANK_CLIP, [(None, 10), (20, 51)], wav_file, outfile)
+            with self.assertRaisesRegex(ValueError, "only 9.900s long"):
+                acsuite.eztrim_array(self.BLANK_CLIP, (None, None), wav_file)
+
+        with self.assertWarnsRegex(Warning, "could not probe"):
+            acsuite.plan_trim(self.BLANK_CLIP, (None, 50), "test_wav_audio.wav", "outfile.wav")
+
+    @unittest.skipIf(os.name != "posix", "the fake FFmpeg is a script")
+    def test_estimated_audio_length(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            fake_ffmpeg = self._fake_ffmpeg(tmp)
+            with open(os.path.join(tmp, "ffprobe"), "w") as f:
+                f.write(
+                    f"#!{sys.executable}\n"
+                    "import json, sys\n"
+                    "raw = sys.argv[-1].endswith('.ac3')\n"
+                    "if raw:\n"
+                    "    print('[ac3 @ 0x0] Estimating duration from bitrate, this may be inaccurate', file=sys.stderr)\n"
+                    "stream = {'codec_name': 'ac3', 'sample_rate': '48000', 'channels': 6, 'duration': '9.900000'}\n"
+                    "fmt = {'format_name': 'ac3' if raw else 'mov,mp4,m4a,3gp,3g2,mj2', 'duration': '9.900000'}\n"
+                    "print(json.dumps({'streams': [stream], 'format': fmt}))\n"
+                )
+            os.chmod(os.path.join(tmp, "ffprobe"), 0o755)
+            for ext in (".ac3", ".m4a"):
+                open(os.path.join(tmp, "audio" + ext), "wb").close()
+            outfile = os.path.join(tmp, "outfile")
+
+            info = acsuite._probe_audio(os.path.join(tmp, "audio.ac3"), fake_ffmpeg)
+            self.assertEqual(info.duration, Fraction(99, 10))
+            self.assertFalse(info.exact_duration)
+            with self.assertWarnsRegex(Warning, "estimated"):
+                plan = acsuite.plan_trim(
+                    self.BLANK_CLIP, (None, 60), os.path.join(tmp, "audio.ac3"), outfile, ffmpeg_path=fake_ffmpeg
+                )
+            self.assertEqual(plan.duration, Fraction(99, 10))
+
+            self.assertTrue(acsuite._probe_audio(os.path.join(tmp, "audio.m4a"), fake_ffmpeg).exact_duration)
+            with self.assertRaisesRegex(ValueError, "only 9.900s long"):
+                acsuite.plan_trim(
+                    self.BLANK_CLIP, (None, 60), os.path.join(tmp, "audio.m4a"), outfile, ffmpeg_path=fake_ffmpeg
+                )
+
+    def test_eztrim_array(self):
+        try:
+            import numpy as np
+        except ImportError:
+            self.skipTest("numpy not installed")
+
+        samples = (np.arange(20 * 1000 * 2).reshape(-1, 2) % 30000).astype("<i2")
+        with tempfile.TemporaryDirectory() as tmp:
+            wav_file = os.path.join(tmp, "audio.wav")
+            with wave.open(wav_file, "wb") as w:
+                w.setnchannels(2)
+                w.setsampwidth(2)
+                w.setframerate(1000)
+                w.writeframes(samples.tobytes())
+
+            single, sample_rate = acsuite.eztrim_array(self.BLANK_CLIP, (5, 10), wav_file)
+            self.assertEqual(sample_rate, 1000)
+            self.assertIsInstance(single, np.memmap)
+            self.assertTrue((single == samples[1000:2000]).all())
+
+            double, _ = acsuite.eztrim_array(self.BLANK_CLIP, [(None, 5), (20, -10)], wav_file)
+            self.assertEqual(double.shape, (15000, 2))
+            self.assertTrue((double == np.concatenate([samples[:1000], samples[4000:18000]])).all())
+
+            # 1/7 s is 142.857... samples
+            clip_7fps = core.std.BlankClip(format=vs.YUV420P8, length=100, fpsnum=7, fpsden=1)
+            floor, _ = acsuite.eztrim_array(clip_7fps, (1, 2), wav_file, rounding="floor")
+            ceil, _ = acsuite.eztrim_array(clip_7fps, (1, 2), wav_file, rounding="ceil")
+            self.assertTrue((floor == samples[142:285]).all())
+            self.assertTrue((ceil == samples[143:286]).all())
+            with self.assertRaisesRegex(ValueError, "rounding"):
+                acsuite.eztrim_array(clip_7fps, (1, 2), wav_file, rounding="nearest")
+            del single, double, floor, ceil
+
+    @unittest.skipIf(os.name != "posix", "the fake FFmpeg is a script")
+    def test_eztrim_array_ffmpeg_errors(self):
+        try:
+            import numpy  # noqa: F401
+        except ImportError:
+            self.skipTest("numpy not installed")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            fake_ffmpeg = os.path.join(tmp, "ffmpeg")
+            with open(fake_ffmpeg, "w") as f:
+                f.write(
+                    f"#!{sys.executable}\n"
+                    "import sys\n"
+                    "if any(arg.endswith('bad.m4a') for arg in sys.argv):\n"
+                    "    sys.exit(1)\n"
+                    "sys.stdout.buffer.write(bytes(4 * 2 * 100))\n"  # 100 of the 1000 samples asked for
+                )
+            with open(os.path.join(tmp, "ffprobe"), "w") as f:
+                f.write(
+                    f"#!{sys.executable}\n"
+                    "import json\n"
+                    "stream = {'codec_name': 'aac', 'sample_rate': '1000', 'channels': 2, 'duration': '20.000000'}\n"
+                    "print(json.dumps({'streams': [stream], 'format': {'format_name': 'mov,mp4,m4a,3gp,3g2,mj2'}}))\n"
+                )
+            for script in ("ffmpeg", "ffprobe"):
+                os.chmod(os.path.join(tmp, script), 0o755)
+            for name in ("bad.m4a", "short.m4a"):
+                open(os.path.join(tmp, name), "wb").close()
+
+            with self.assertRaisesRegex(RuntimeError, "exit code 1"):
+                acsuite.eztrim_array(self.BLANK_CLIP, (5, 10), os.path.join(tmp, "bad.m4a"), ffmpeg_path=fake_ffmpeg)
+            with self.assertWarnsRegex(Warning, "only decoded 100 of 1000 samples"):
+                short, _ = acsuite.eztrim_array(
+                    self.BLANK_CLIP, (5, 10), os.path.join(tmp, "short.m4a"), ffmpeg_path=fake_ffmpeg
+                )
+            self.assertEqual(short.shape, (100, 2))
+
+    def test_progress(self):
+        reports = []
+        acsuite._read_progress(
+            io.StringIO(
+                "out_time_us=N/A\ntotal_size=0\nspeed=N/A\nprogress=continue\n"
+                "out_time_us=1500000\ntotal_size=4096\nspeed=12.5x\nprogress=end\n"
+            ),
+            lambda *args: reports.append(args),
+            [],
+        )
+        self.assertEqual(reports, [(0.0, None, 0, False), (1.5, 12.5, 4096, True)])
+
+        progress = []
+        tracker = acsuite._ProgressTracker(progress.append, [2.0, 4.0])
+        tracker.step(1)(1.0, 2.0, 100, False)
+        tracker.step(0)(2.0, 2.0, 100, True)
+        self.assertEqual(progress[-1].total_time, 3.0)
+        self.assertEqual(progress[-1].total_duration, 6.0)
+        self.assertIsNone(acsuite._ProgressTracker(None, [2.0]).step(0))
+
+        token = acsuite.CancelToken()
+        self.assertFalse(token.cancelled)
+        token.cancel()
+        self.assertTrue(token.wait(0))
+
+    def _fake_ffmpeg(self, tmp):
+        """Writes a stand-in for FFmpeg that creates its output and streams progress until killed (or for 30 s)."""
+        fake_ffmpeg = os.path.join(tmp, "ffmpeg")
+        with open(fake_ffmpeg, "w") as f:
+            f.write(
+                f"#!{sys.executable}\n"
+                "import sys, time\n"
+                "open(sys.argv[-1], 'w').close()\n"
+                "if '_0.' in sys.argv[-1]:\n"
+                "    sys.exit(print('progress=end'))\n"
+                "deadline = time.monotonic() + 30\n"
+                "while time.monotonic() < deadline:\n"
+                "    print('out_time_us=1000000\\ntotal_size=0\\nspeed=1x\\nprogress=continue', flush=True)\n"
+            )
+        os.chmod(fake_ffmpeg, 0o755)
+        return fake_ffmpeg
+
+    @unittest.skipIf(os.name != "posix", "the fake FFmpeg is a script")
+    def test_progress_callback_error(self):
+        def fail(*args):
+            raise RuntimeError("callback failed")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            outfile = os.path.join(tmp, "outfile.wav")
+            start = time.monotonic()
+            with self.assertRaisesRegex(RuntimeError, "callback failed"):
+                acsuite._run_ffmpeg([self._fake_ffmpeg(tmp), outfile], on_progress=fail)
+            self.assertLess(time.monotonic() - start, 10)
+            self.assertFalse(os.path.exists(outfile))
+
+            users_file = os.path.join(tmp, "users_file.wav")
+            open(users_file, "w").close()
+            with self.assertRaisesRegex(RuntimeError, "callback failed"):
+                acsuite._run_ffmpeg([self._fake_ffmpeg(tmp), users_file], on_progress=fail)
+            self.assertTrue(os.path.exists(users_file))
+
+    @unittest.skipIf(os.name != "posix", "the fake FFmpeg is a script")
+    def test_executor_callback_error(self):
+        def fail_on(segment):
+            def progress(p):
+                if p.segment == segment:
+                    raise RuntimeError("callback failed")
+
+            return progress
+
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as tmp:
+            os.chdir(tmp)
+            try:
+                with wave.open("audio.wav", "wb") as w:
+                    w.setnchannels(1)
+                    w.setsampwidth(2)
+                    w.setframerate(1000)
+                    w.writeframes(bytes(2 * 20000))
+                fake_ffmpeg = self._fake_ffmpeg(tmp)
+                plan = acsuite.plan_trim(
+                    self.BLANK_CLIP, [(None, 10), (20, 30)], "audio.wav", "outfile.wav", ffmpeg_path=fake_ffmpeg
+                )
+
+                for executor, segment in ((acsuite.SerialExecutor(), 1), (acsuite.ThreadedExecutor(2), 0)):
+                    start = time.monotonic()
+                    with self.assertRaisesRegex(RuntimeError, "callback failed"):
+                        executor.execute(plan, progress=fail_on(segment))
+                    self.assertLess(time.monotonic() - start, 10)
+                    self.assertEqual(sorted(os.listdir()), ["audio.wav", "ffmpeg"])
+            finally:
+                os.chdir(cwd)
+
+    @unittest.skipIf(os.name != "posix", "the fake FFmpeg is a script")
+    def test_cancel(self):
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as tmp:
+            os.chdir(tmp)
+            try:
+                with wave.open("audio.wav", "wb") as w:
+                    w.setnchannels(1)
+                    w.setsampwidth(2)
+                    w.setframerate(1000)
+                    w.writeframes(bytes(2 * 20000))
+                fake_ffmpeg = self._fake_ffmpeg(tmp)
+                plan = acsuite.plan_trim(
+                    self.BLANK_CLIP, [(None, 10), (20, 30)], "audio.wav", "outfile.wav", ffmpeg_path=fake_ffmpeg
+                )
+
+                token = acsuite.CancelToken()
+                token.cancel()
+                with open("_acsuite_temp_output_0.wav", "w"):  # not ours, must survive the cleanup
+                    pass
+                with self.assertRaises(futures.CancelledError):
+                    acsuite.PCMExecutor().execute(plan, cancel=token)
+                self.assertEqual(sorted(os.listdir()), ["_acsuite_temp_output_0.wav", "audio.wav", "ffmpeg"])
+                os.remove("_acsuite_temp_output_0.wav")
+
+                token = acsuite.CancelToken()
+                with self.assertRaises(futures.CancelledError):
+                    acsuite.SerialExecutor().execute(
+                        plan, progress=lambda p: p.segment == 1 and token.cancel(), cancel=token
+                    )
+                self.assertEqual(sorted(os.listdir()), ["audio.wav", "ffmpeg"])
+            finally:
+                os.chdir(cwd)
 
     def test_concat(self):
         with self.assertRaisesRegex(ValueError, "2 or more"):
@@ -200,22 +581,15 @@ class ACsuiteTests(unittest.TestCase):
 
         # --------------------------------------------------------------------------------------------------------------
 
-        temp_file = open("_acsuite_temp_concat.txt", "w")
-        temp_file.write("t")
-        temp_file.close()
-
-        with self.assertRaisesRegex(FileExistsError, "concat"):
-            acsuite.concat(["test_wav_audio.wav", "test_wav_audio1.wav"], "outfile.wav")
-
-        os.remove("_acsuite_temp_concat.txt")
-
-        # --------------------------------------------------------------------------------------------------------------
-
         args = [shutil.which("ffmpeg"), "-hide_banner"] + [
             "-f",
             "concat",
+            "-safe",
+            "0",
+            "-protocol_whitelist",
+            "file,pipe",
             "-i",
-            "_acsuite_temp_concat.txt",
+            "pipe:0",
             "-c",
             "copy",
             "outfile.wav",
@@ -225,6 +599,35 @@ class ACsuiteTests(unittest.TestCase):
             acsuite.concat(["test_wav_audio.wav", "test_wav_audio1.wav"], "outfile.wav", debug=True)["args"],
             args,
         )
+        self.assertEqual(acsuite._concat_list(["/a/it's.wav"]), "file 'file:/a/it'\\''s.wav'\n")
+
+        # --------------------------------------------------------------------------------------------------------------
+
+        with tempfile.TemporaryDirectory() as tmp:
+            wav_files = [os.path.join(tmp, f"{i}.wav") for i in range(3)]
+            for wav_file, channels in zip(wav_files, [2, 2, 1]):
+                with wave.open(wav_file, "wb") as w:
+                    w.setnchannels(channels)
+                    w.setsampwidth(2)
+                    w.setframerate(1000)
+                    w.writeframes(bytes(range(256)) * 16)
+
+            self.assertIs(acsuite._probe_audio(wav_files[0]), acsuite._probe_audio(wav_files[0]))
+            with self.assertRaisesRegex(ValueError, "does not match"):
+                acsuite.concat(wav_files, os.path.join(tmp, "outfile.wav"))
+
+            outfile = os.path.join(tmp, "outfile.wav")
+            acsuite.concat(wav_files[:2], outfile)
+            with wave.open(outfile, "rb") as w:
+                self.assertEqual(w.getnchannels(), 2)
+                self.assertEqual(w.readframes(w.getnframes()), bytes(range(256)) * 32)
+
+            if os.name == "posix":
+                mp3_files = [os.path.join(tmp, f"{i}.mp3") for i in range(2)]
+                for mp3_file in mp3_files:
+                    open(mp3_file, "wb").close()
+                with self.assertWarnsRegex(Warning, "could not probe"):
+                    acsuite.concat(mp3_files, os.path.join(tmp, "out_0.mp3"), ffmpeg_path=self._fake_ffmpeg(tmp))
 
 
 if __name__ == "__main__":